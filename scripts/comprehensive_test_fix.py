@@ -9,6 +9,8 @@ import sys
 import subprocess
 import time
 import signal
+import tempfile
+import xml.etree.ElementTree as ET
 from pathlib import Path
 
 def run_command_with_timeout(command, timeout=30):
@@ -117,6 +119,28 @@ def fix_common_issues():
     
     return fixes_applied
 
+def failed_test_files(junitxml, test_files):
+    """Return the test files with failing or erroring cases in a JUnit XML report
+    
+    Returns None when the report is missing or unreadable.
+    """
+    try:
+        tree = ET.parse(junitxml)
+    except (OSError, ET.ParseError):
+        return None
+    
+    # classname is the dotted module path, e.g. tests.unit.test_x.TestX
+    modules = {test_file[:-len(".py")].replace("/", "."): test_file for test_file in test_files}
+    failed = set()
+    for testcase in tree.iter("testcase"):
+        if testcase.find("failure") is None and testcase.find("error") is None:
+            continue
+        classname = testcase.get("classname", "")
+        for module, test_file in modules.items():
+            if classname == module or classname.startswith(module + "."):
+                failed.add(test_file)
+    return failed
+
 def run_unit_tests():
     """Run unit tests with timeout"""
     print("\n🧪 Running unit tests...")
@@ -130,27 +154,45 @@ def run_unit_tests():
     ]
     
     results = []
+    existing = []
     
     for test_file in test_files:
         if os.path.exists(test_file):
-            print(f"  Running {test_file}...")
-            code, stdout, stderr = run_command_with_timeout(
-                f"python -m pytest {test_file} -v --tb=short",
-                timeout=60
-            )
-            
-            if code == 0:
-                print(f"    ✅ {test_file} passed")
-                results.append((test_file, "PASS"))
-            else:
-                print(f"    ❌ {test_file} failed")
-                print(f"      STDOUT: {stdout}")
-                print(f"      STDERR: {stderr}")
-                results.append((test_file, "FAIL"))
+            existing.append(test_file)
         else:
             print(f"    ⚠️  {test_file} not found")
             results.append((test_file, "NOT_FOUND"))
     
+    if not existing:
+        return results
+    
+    # Collect and run every file in one pytest session instead of one per file
+    print(f"  Running {len(existing)} test files...")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        junitxml = os.path.join(tmp_dir, "results.xml")
+        code, stdout, stderr = run_command_with_timeout(
+            f"python -m pytest {' '.join(existing)} -v --tb=short --junitxml={junitxml}",
+            timeout=60 * len(existing)
+        )
+        
+        # Exit codes 0/1 mean tests ran; anything else (timeout, collection or
+        # usage error) means no per-file results can be trusted
+        failed_files = failed_test_files(junitxml, existing) if code in (0, 1) else None
+    if failed_files is None:
+        failed_files = set(existing)
+    
+    for test_file in existing:
+        if test_file not in failed_files:
+            print(f"    ✅ {test_file} passed")
+            results.append((test_file, "PASS"))
+        else:
+            print(f"    ❌ {test_file} failed")
+            results.append((test_file, "FAIL"))
+    
+    if failed_files:
+        print(f"      STDOUT: {stdout}")
+        print(f"      STDERR: {stderr}")
+    
     return results
 
 def run_refactored_tests():
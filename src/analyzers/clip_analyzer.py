@@ -3,12 +3,18 @@ import base64
 import os
 import json
 import argparse
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
 import datetime
 import hashlib
 import sys
 import threading
+import copy
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Import database
 from src.database.db_manager import DatabaseManager
@@ -35,10 +41,45 @@ EMOJI_PROCESSING = get_config_value("EMOJI_PROCESSING", "PROCESSING")
 # Initialize database manager
 db_manager = DatabaseManager()
 
-# Global session cache for authenticated requests (thread-safe)
-_session_cache: Optional[requests.Session] = None
-_session_url: Optional[str] = None
+# Global session cache keyed by (api_base_url, password hash) so connections
+# are kept alive between images (thread-safe)
+_session_cache: Dict[Tuple[str, str], requests.Session] = {}
 _session_lock = threading.Lock()  # Lock for thread-safe access to session cache
+# Pools kept per session (one per host) and connections kept per pool
+_SESSION_POOL_CONNECTIONS = 16
+_SESSION_POOL_MAXSIZE = 64
+# Failed connects are retried twice, sleeping backoff_factor * 2**(n-1)
+# seconds before the n-th consecutive retry (none before the first)
+_SESSION_RETRIES = 2
+_SESSION_RETRY_BACKOFF = 0.2
+
+# In-process cache of successful analyses, keyed by (md5, api_base_url, model, modes)
+_ANALYSIS_CACHE_SIZE = 128
+_analysis_cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_analysis_lock = threading.Lock()
+
+
+def clear_analysis_cache() -> None:
+    """Drop all cached CLIP analysis results and file hashes"""
+    with _analysis_lock:
+        _analysis_cache.clear()
+    _md5_of_path.cache_clear()
+
+
+def clear_session_cache() -> None:
+    """Drop all cached CLIP API sessions"""
+    with _session_lock:
+        _session_cache.clear()
+
+
+def _create_session() -> requests.Session:
+    """Create a session with a connection pool sized for concurrent mode requests"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=_SESSION_POOL_CONNECTIONS, pool_maxsize=_SESSION_POOL_MAXSIZE,
+                          max_retries=Retry(total=_SESSION_RETRIES, backoff_factor=_SESSION_RETRY_BACKOFF))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 def get_authenticated_session(api_base_url: str, password: Optional[str] = None) -> requests.Session:
@@ -46,7 +87,8 @@ def get_authenticated_session(api_base_url: str, password: Optional[str] = None)
     Get an authenticated session for the CLIP API.
     
     For Stable Diffusion Forge APIs that require Pinokio authentication,
-    this function logs in and returns a session with auth cookies.
+    this function logs in and returns a session with auth cookies. Sessions
+    are cached per URL and password so their connections are reused.
     
     Args:
         api_base_url: Base URL of the CLIP API
@@ -56,29 +98,33 @@ def get_authenticated_session(api_base_url: str, password: Optional[str] = None)
     Returns:
         requests.Session: Authenticated session (or regular session if no auth needed)
     """
-    global _session_cache, _session_url
-    
     # Thread-safe access to session cache
     with _session_lock:
-        # Return cached session if we have one for this URL
-        if _session_cache and _session_url == api_base_url:
-            # Test if session is still valid
+        # Get password from config if not provided
+        if password is None:
+            password = get_config_value("CLIP_API_PASSWORD")
+        
+        cache_key = (api_base_url, hashlib.sha256(password.encode()).hexdigest() if password else "")
+        
+        # Return cached session if we have one for this URL and password
+        cached_session = _session_cache.get(cache_key)
+        if cached_session is not None:
+            if not password:
+                return cached_session
+            # Test if authenticated session is still valid
             try:
-                test_response = _session_cache.get(f"{api_base_url}/info", timeout=5)
+                test_response = cached_session.get(f"{api_base_url}/info", timeout=5)
                 if test_response.status_code == 200:
                     logger.debug("Using cached authenticated session")
-                    return _session_cache
+                    return cached_session
                 else:
                     logger.debug("Cached session expired, re-authenticating")
             except (requests.RequestException, requests.Timeout, requests.ConnectionError) as e:
                 logger.debug(f"Cached session failed, re-authenticating: {e}")
+            del _session_cache[cache_key]
         
         # Create new session
-        session = requests.Session()
-        
-        # Get password from config if not provided
-        if password is None:
-            password = get_config_value("CLIP_API_PASSWORD")
+        session = _create_session()
         
         # If password provided, attempt authentication
         if password:
@@ -95,8 +141,7 @@ def get_authenticated_session(api_base_url: str, password: Optional[str] = None)
                 # Check if we got a session cookie
                 if 'connect.sid' in session.cookies:
                     logger.info("✅ Successfully authenticated with CLIP API")
-                    _session_cache = session
-                    _session_url = api_base_url
+                    _session_cache[cache_key] = session
                     return session
                 else:
                     logger.warning("No session cookie received, continuing without authentication")
@@ -104,6 +149,7 @@ def get_authenticated_session(api_base_url: str, password: Optional[str] = None)
                 logger.warning(f"Authentication failed: {e}. Continuing without authentication.")
         else:
             logger.debug("No password provided, using unauthenticated session")
+            _session_cache[cache_key] = session
         
         # Return regular session (no auth)
         return session
@@ -124,7 +170,8 @@ def encode_image_to_base64(image_path: str) -> str:
         raise Exception(f"Failed to encode image {image_path}: {e}")
 
 def prompt_image(image_path: str, api_base_url: str, model: str, modes: List[str], 
-                timeout: int = 60, password: Optional[str] = None) -> Dict[str, Any]:
+                timeout: int = 60, password: Optional[str] = None,
+                encoded_image: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate prompts for an image using CLIP interrogator.
     
@@ -135,12 +182,13 @@ def prompt_image(image_path: str, api_base_url: str, model: str, modes: List[str
         modes: List of analysis modes (best, fast, classic, negative, caption)
         timeout: Request timeout in seconds
         password: Optional password for authentication
+        encoded_image: Base64 image body, if the caller already encoded it
     
     Returns:
         Dict with status and prompt results
     """
     try:
-        image_base64 = encode_image_to_base64(image_path)
+        image_base64 = encoded_image or encode_image_to_base64(image_path)
         if not image_base64:
             return {"status": "error", "message": "Failed to encode image"}
         
@@ -187,9 +235,59 @@ def prompt_image(image_path: str, api_base_url: str, model: str, modes: List[str
         logger.error(f"Failed to generate prompts: {e}")
         return {"status": "error", "message": str(e)}
 
+def _analyze_mode(session: requests.Session, api_base_url: str, encoded_image: str,
+                  model: str, mode: str) -> Dict[str, Any]:
+    """Run one CLIP analyze request and return its result or an error entry"""
+    # Prepare payload for analysis
+    payload = {
+        "image": encoded_image,
+        "model": model,
+        "mode": mode
+    }
+
+    logger.debug(f"Sending analysis request to {api_base_url}/interrogator/analyze for mode: {mode}")
+
+    headers = {
+        "Content-Type": "application/json"
+    }
+
+    # Make the API request with authenticated session
+    try:
+        response = session.post(
+            f"{api_base_url}/interrogator/analyze", 
+            headers=headers, 
+            json=payload,
+            timeout=300
+        )
+        response.raise_for_status()
+        result = response.json()
+        
+        # Ensure 'status' key is present
+        if "status" not in result:
+            result["status"] = "success"
+        
+        logger.debug(f"Successfully processed mode: {mode}")
+        return result
+
+    except requests.exceptions.Timeout:
+        error_msg = f"CLIP API request timed out for mode: {mode}"
+        
+    except requests.exceptions.ConnectionError:
+        error_msg = f"Cannot connect to CLIP API at {api_base_url} for mode: {mode}"
+        
+    except requests.exceptions.HTTPError as http_err:
+        error_msg = f"HTTP error during CLIP analysis for mode {mode}: {http_err}"
+        
+    except Exception as err:
+        error_msg = f"Unexpected error during CLIP analysis for mode {mode}: {err}"
+    
+    logger.error(error_msg)
+    return {"status": "error", "message": error_msg}
+
 def analyze_image_with_clip(image_path: str, api_base_url: str, model: str, modes: List[str], 
                            force_reprocess: bool = False, progress_callback=None, 
-                           password: Optional[str] = None) -> Dict[str, Any]:
+                           password: Optional[str] = None,
+                           encoded_image: Optional[str] = None) -> Dict[str, Any]:
     """
     Analyze an image using CLIP interrogator with comprehensive error handling and progress updates.
     
@@ -198,9 +296,10 @@ def analyze_image_with_clip(image_path: str, api_base_url: str, model: str, mode
         api_base_url: Base URL of the CLIP API
         model: CLIP model name to use
         modes: List of analysis modes (best, fast, classic, negative, caption)
-        force_reprocess: Force reprocessing even if cached
+        force_reprocess: Bypass the in-process cache of earlier results
         progress_callback: Optional callback function for progress updates
         password: Optional password for authentication
+        encoded_image: Base64 image body, if the caller already encoded it
     
     Returns:
         Dict with status and analysis results
@@ -218,75 +317,48 @@ def analyze_image_with_clip(image_path: str, api_base_url: str, model: str, mode
         if not modes:
             return {"status": "error", "message": "No analysis modes specified"}
         
+        # Return a cached result for the same image, server, model and modes
+        image_md5 = compute_md5(image_path)
+        cache_key = (image_md5, api_base_url, model, tuple(sorted(modes)))
+        if not force_reprocess:
+            with _analysis_lock:
+                cached = _analysis_cache.get(cache_key)
+                if cached is not None:
+                    _analysis_cache.move_to_end(cache_key)
+            if cached is not None:
+                logger.debug(f"Using cached CLIP analysis for {image_path}")
+                result = copy.deepcopy(cached)
+                result["modes"] = modes
+                return result
+        
         # Get authenticated session
         session = get_authenticated_session(api_base_url, password)
         
-        # Read and encode image
-        try:
-            with open(image_path, "rb") as image_file:
-                image_data = image_file.read()
-                encoded_image = base64.b64encode(image_data).decode('utf-8')
-        except Exception as e:
-            return {"status": "error", "message": f"Failed to read image file: {e}"}
+        # Read and encode image unless the caller already did
+        if encoded_image is None:
+            try:
+                with open(image_path, "rb") as image_file:
+                    image_data = image_file.read()
+                    encoded_image = base64.b64encode(image_data).decode('utf-8')
+            except Exception as e:
+                return {"status": "error", "message": f"Failed to read image file: {e}"}
         
-        # Process each mode with progress updates
-        results = {}
-        for i, mode in enumerate(modes, 1):
+        # Process each mode with progress updates; modes are independent
+        # requests, so more than one is sent concurrently
+        if len(modes) == 1:
             if progress_callback:
-                progress_callback(step="CLIP", mode=mode)
-            
-            logger.debug(f"Processing CLIP mode {i}/{len(modes)}: {mode}")
-            
-            # Prepare payload for analysis
-            payload = {
-                "image": encoded_image,
-                "model": model,
-                "mode": mode
-            }
-
-            logger.debug(f"Sending analysis request to {api_base_url}/interrogator/analyze for mode: {mode}")
-
-            headers = {
-                "Content-Type": "application/json"
-            }
-
-            # Make the API request with authenticated session
-            try:
-                response = session.post(
-                    f"{api_base_url}/interrogator/analyze", 
-                    headers=headers, 
-                    json=payload,
-                    timeout=300
-                )
-                response.raise_for_status()
-                result = response.json()
-                
-                # Ensure 'status' key is present
-                if "status" not in result:
-                    result["status"] = "success"
-                
-                results[mode] = result
-                logger.debug(f"Successfully processed mode: {mode}")
-
-            except requests.exceptions.Timeout:
-                error_msg = f"CLIP API request timed out for mode: {mode}"
-                logger.error(error_msg)
-                results[mode] = {"status": "error", "message": error_msg}
-                
-            except requests.exceptions.ConnectionError:
-                error_msg = f"Cannot connect to CLIP API at {api_base_url} for mode: {mode}"
-                logger.error(error_msg)
-                results[mode] = {"status": "error", "message": error_msg}
-                
-            except requests.exceptions.HTTPError as http_err:
-                error_msg = f"HTTP error during CLIP analysis for mode {mode}: {http_err}"
-                logger.error(error_msg)
-                results[mode] = {"status": "error", "message": error_msg}
-                
-            except Exception as err:
-                error_msg = f"Unexpected error during CLIP analysis for mode {mode}: {err}"
-                logger.error(error_msg)
-                results[mode] = {"status": "error", "message": error_msg}
+                progress_callback(step="CLIP", mode=modes[0])
+            results = {modes[0]: _analyze_mode(session, api_base_url, encoded_image, model, modes[0])}
+        else:
+            with ThreadPoolExecutor(max_workers=len(modes)) as executor:
+                futures = {}
+                for i, mode in enumerate(modes, 1):
+                    if progress_callback:
+                        progress_callback(step="CLIP", mode=mode)
+                    logger.debug(f"Processing CLIP mode {i}/{len(modes)}: {mode}")
+                    futures[mode] = executor.submit(_analyze_mode, session, api_base_url,
+                                                    encoded_image, model, mode)
+                results = {mode: future.result() for mode, future in futures.items()}
         
         # Create final result structure
         final_result = {
@@ -296,6 +368,14 @@ def analyze_image_with_clip(image_path: str, api_base_url: str, model: str, mode
             "results": results
         }
         
+        # Only cache complete results so failed modes are retried next time
+        if image_md5 != "unknown" and all(r.get("status") != "error" for r in results.values()):
+            with _analysis_lock:
+                _analysis_cache[cache_key] = copy.deepcopy(final_result)
+                _analysis_cache.move_to_end(cache_key)
+                while len(_analysis_cache) > _ANALYSIS_CACHE_SIZE:
+                    _analysis_cache.popitem(last=False)
+        
         logger.info(f"CLIP analysis completed successfully for {image_path}")
         return final_result
 
@@ -339,13 +419,19 @@ def process_image_with_clip(image_path: str, api_base_url: str, model: str, mode
                     "from_database": True
                 }
         
+        # Encode once for both the prompt and analyze requests
+        encoded_image = encode_image_to_base64(image_path)
+        
         # Generate prompts (with authentication)
-        prompt_results = prompt_image(image_path, api_base_url, model, modes, password=password)
+        prompt_results = prompt_image(image_path, api_base_url, model, modes, password=password,
+                                      encoded_image=encoded_image)
         if prompt_results.get("status") == "error":
             return {"status": "error", "message": f"Prompt generation failed: {prompt_results.get('message')}"}
 
         # Perform image analysis (with authentication)
-        analysis_results = analyze_image_with_clip(image_path, api_base_url, model, modes, password=password)
+        analysis_results = analyze_image_with_clip(image_path, api_base_url, model, modes,
+                                                   force_reprocess=force_reprocess, password=password,
+                                                   encoded_image=encoded_image)
         if analysis_results.get("status") == "error":
             return {"status": "error", "message": f"Analysis failed: {analysis_results.get('message')}"}
 
@@ -393,14 +479,29 @@ def process_image_with_clip(image_path: str, api_base_url: str, model: str, mode
         logger.error(error_msg)
         return {"status": "error", "message": error_msg}
 
+def _new_md5():
+    """hashlib.md5 marked as a non-security use where supported (Python 3.9+)"""
+    if sys.version_info >= (3, 9):
+        try:
+            return hashlib.md5(usedforsecurity=False)
+        except TypeError:
+            pass
+    return hashlib.md5()
+
+@lru_cache(maxsize=4096)
+def _md5_of_path(file_path: str, mtime_ns: int, size: int) -> str:
+    """MD5 of a file; mtime and size are part of the cache key so edits rehash"""
+    hash_md5 = _new_md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            hash_md5.update(chunk)
+    return hash_md5.hexdigest()
+
 def compute_md5(file_path: str) -> str:
     """Compute MD5 hash of a file"""
-    hash_md5 = hashlib.md5()
     try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        stat = os.stat(file_path)
+        return _md5_of_path(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
     except Exception as e:
         logger.error(f"Failed to compute MD5 for {file_path}: {e}")
         return "unknown"
@@ -14,7 +14,8 @@ from .config_manager import (
     get_all_config,
     load_typed_config,
     update_public_config,
-    update_private_config
+    update_private_config,
+    update_config_bulk
 )
 from .config_models import (
     AppConfig,
@@ -37,6 +38,7 @@ __all__ = [
     'load_typed_config',
     'update_public_config',
     'update_private_config',
+    'update_config_bulk',
     'AppConfig',
     'CLIPConfig',
     'LLMConfig',
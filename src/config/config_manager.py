@@ -8,11 +8,20 @@ Manages application configuration with separate handling for:
 """
 
 import os
+import copy
 import json
+import shutil
 import sys
+import tempfile
 from pathlib import Path
-from typing import Dict, Any, Optional, Union, List
-from dotenv import load_dotenv
+from typing import Dict, Any, Optional, Union, List, BinaryIO
+from dotenv import dotenv_values
+
+try:
+    import orjson
+except ImportError:  # Optional fast JSON parser, stdlib json is used without it
+    orjson = None
+
 from .config_models import AppConfig, CLIPConfig, LLMConfig, DatabaseConfig, WebConfig, AnalysisConfig, DirectoryConfig
 
 # Add project root to path for imports
@@ -20,33 +29,76 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 
-def get_project_root() -> str:
-    """Get the project root directory"""
-    return str(project_root)
+# Parsed config.json contents keyed by path, with the (st_mtime_ns, st_size) they were read at
+_CONFIG_CACHE: Dict[str, tuple] = {}
 
+# Parsed .env contents keyed the same way
+_ENV_CACHE: Dict[str, tuple] = {}
 
-def load_env_file(project_root: str = None) -> bool:
-    """Load environment variables from .env file"""
-    if project_root is None:
-        project_root = get_project_root()
-    
-    env_file = os.path.join(project_root, '.env')
-    if os.path.exists(env_file):
-        load_dotenv(env_file)
-        return True
-    return False
+
+def _file_signature(path: str) -> Optional[tuple]:
+    """Return (st_mtime_ns, st_size) used to tell whether a file has changed, or None if it can't be stat'ed"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
 
 
-def create_default_env_file(project_root: str = None) -> bool:
-    """Create default .env file with API keys and private settings"""
-    if project_root is None:
-        project_root = get_project_root()
-    
-    env_file = os.path.join(project_root, '.env')
-    
-    # Private configuration (API keys, URLs, etc.)
-    # This should match secure_env_example.txt exactly
-    env_content = """# =============================================================================
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to 2-space indented UTF-8 JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _current_umask() -> int:
+    """Return the process umask (it can only be read by setting it)"""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+def _write_file_atomic(path: str, data: bytes):
+    """Write data to a temp file next to path, then swap it into place
+
+    Readers see either the old or the new file, never a partial write.
+    The temp file gets a unique name, so concurrent writers don't clobber
+    each other, and takes over the permissions of the file it replaces
+    (umask defaults for a new file), so a chmod 600 on .env survives.
+    The data is only fsync'ed before the swap when CONFIG_FSYNC is enabled.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.',
+                                    prefix=os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if os.getenv('CONFIG_FSYNC', 'False').lower() in ('true', '1', 'yes', 'on'):
+                f.flush()
+                os.fsync(f.fileno())
+        try:
+            shutil.copymode(path, tmp_path)
+        except FileNotFoundError:
+            os.chmod(tmp_path, 0o666 & ~_current_umask())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# Private configuration (API keys, URLs, etc.) written by create_default_env_file
+# This should match secure_env_example.txt exactly
+_DEFAULT_ENV_BYTES = """# =============================================================================
 # SECURE CONFIGURATION - API Keys and Sensitive Data Only
 # =============================================================================
 # Copy this file to .env and add your actual API keys
@@ -185,11 +237,84 @@ DEBUG=False
 
 # Prompt choices (comma-separated: P1,P2,P3,P4,P5)
 PROMPT_CHOICES=P1,P2
-"""
+""".encode('utf-8')
+
+# Public configuration (safe to commit to GitHub), serialized once at import
+_DEFAULT_CONFIG_BYTES = _json_dumps({
+    "clip_config": {
+        "api_base_url": "http://localhost:7860",
+        "model_name": "ViT-L-14/openai",
+        "enable_clip_analysis": True,
+        "clip_modes": ["best", "fast", "classic"],
+        "prompt_choices": ["P1", "P2", "P3", "P4", "P5"]
+    },
+    "analysis_features": {
+        "enable_llm_analysis": True,
+        "enable_metadata_extraction": True,
+        "enable_parallel_processing": True,
+        "generate_summaries": True,
+        "retry_limit": 3,
+        "timeout": 120
+    },
+    "logging": {
+        "level": "INFO",
+        "file": "app.log",
+        "max_size": "10MB",
+        "backup_count": 5
+    },
+    "ui_settings": {
+        "theme": "light",
+        "language": "en",
+        "auto_refresh": True,
+        "refresh_interval": 30
+    },
+    "file_handling": {
+        "max_file_size": "50MB",
+        "allowed_extensions": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff"],
+        "output_format": "json",
+        "compress_output": False
+    }
+})
+
+
+def get_project_root() -> str:
+    """Get the project root directory"""
+    return str(project_root)
+
+
+def load_env_file(project_root: str = None) -> bool:
+    """Load environment variables from .env file"""
+    if project_root is None:
+        project_root = get_project_root()
+    
+    env_file = os.path.join(project_root, '.env')
+    if os.path.exists(env_file):
+        # Only re-parse a .env file that changed since it was last read, but
+        # apply it on every call so keys dropped from os.environ come back
+        signature = _file_signature(env_file)
+        cached = _ENV_CACHE.get(env_file)
+        if signature is None or cached is None or cached[0] != signature:
+            cached = (signature, dotenv_values(env_file))
+            _ENV_CACHE[env_file] = cached
+        # Same as load_dotenv(): variables already set in the environment win
+        for key, value in cached[1].items():
+            if value is not None:
+                os.environ.setdefault(key, value)
+        return True
+    return False
+
+
+def create_default_env_file(project_root: str = None) -> bool:
+    """Create default .env file with API keys and private settings"""
+    if project_root is None:
+        project_root = get_project_root()
+    
+    env_file = os.path.join(project_root, '.env')
     
     try:
-        with open(env_file, 'w', encoding='utf-8') as f:
-            f.write(env_content)
+        with open(env_file, 'wb') as f:
+            f.write(_DEFAULT_ENV_BYTES)
+        _ENV_CACHE.pop(env_file, None)
         print(f"✅ Created .env file at {env_file}")
         print("⚠️  IMPORTANT: Edit .env file and add your actual API keys!")
         return True
@@ -205,46 +330,10 @@ def create_default_config_file(project_root: str = None) -> bool:
     
     config_file = os.path.join(project_root, 'config.json')
     
-    # Public configuration (safe to commit to GitHub)
-    default_config = {
-        "clip_config": {
-            "api_base_url": "http://localhost:7860",
-            "model_name": "ViT-L-14/openai",
-            "enable_clip_analysis": True,
-            "clip_modes": ["best", "fast", "classic"],
-            "prompt_choices": ["P1", "P2", "P3", "P4", "P5"]
-        },
-        "analysis_features": {
-            "enable_llm_analysis": True,
-            "enable_metadata_extraction": True,
-            "enable_parallel_processing": True,
-            "generate_summaries": True,
-            "retry_limit": 3,
-            "timeout": 120
-        },
-        "logging": {
-            "level": "INFO",
-            "file": "app.log",
-            "max_size": "10MB",
-            "backup_count": 5
-        },
-        "ui_settings": {
-            "theme": "light",
-            "language": "en",
-            "auto_refresh": True,
-            "refresh_interval": 30
-        },
-        "file_handling": {
-            "max_file_size": "50MB",
-            "allowed_extensions": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff"],
-            "output_format": "json",
-            "compress_output": False
-        }
-    }
-    
     try:
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(default_config, f, indent=2, ensure_ascii=False)
+        with open(config_file, 'wb') as f:
+            f.write(_DEFAULT_CONFIG_BYTES)
+        _CONFIG_CACHE.pop(config_file, None)
         print(f"✅ Created config.json file at {config_file}")
         return True
     except Exception as e:
@@ -252,6 +341,16 @@ def create_default_config_file(project_root: str = None) -> bool:
         return False
 
 
+def read_config_stream(fp: BinaryIO) -> Dict[str, Any]:
+    """Parse public configuration from a binary file-like object"""
+    return _json_loads(fp.read())
+
+
+def write_config_stream(config: Dict[str, Any], fp: BinaryIO) -> None:
+    """Write public configuration as JSON to a binary file-like object"""
+    fp.write(_json_dumps(config))
+
+
 def load_config_file(project_root: str = None) -> Dict[str, Any]:
     """Load public configuration from config.json"""
     if project_root is None:
@@ -265,9 +364,15 @@ def load_config_file(project_root: str = None) -> Dict[str, Any]:
         create_default_config_file(project_root)
     
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        return config
+        signature = _file_signature(config_file)
+        cached = _CONFIG_CACHE.get(config_file)
+        if signature is None or cached is None or cached[0] != signature:
+            with open(config_file, 'rb') as f:
+                cached = (signature, read_config_stream(f))
+            if signature is not None:
+                _CONFIG_CACHE[config_file] = cached
+        # Hand out a copy so callers can't mutate the cached dict
+        return copy.deepcopy(cached[1])
     except Exception as e:
         print(f"❌ Error loading config file: {e}")
         return {}
@@ -281,8 +386,8 @@ def save_config_file(config: Dict[str, Any], project_root: str = None) -> bool:
     config_file = os.path.join(project_root, 'config.json')
     
     try:
-        with open(config_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        _write_file_atomic(config_file, _json_dumps(config))
+        _CONFIG_CACHE.pop(config_file, None)
         return True
     except Exception as e:
         print(f"❌ Error saving config file: {e}")
@@ -568,36 +673,7 @@ def get_all_config(project_root: str = None) -> Dict[str, Any]:
 
 def set_env_value(key: str, value: str, project_root: str = None) -> bool:
     """Set environment variable in .env file"""
-    if project_root is None:
-        project_root = get_project_root()
-    
-    env_file = os.path.join(project_root, '.env')
-    
-    # Read existing .env file
-    env_lines = []
-    if os.path.exists(env_file):
-        with open(env_file, 'r', encoding='utf-8') as f:
-            env_lines = f.readlines()
-    
-    # Update or add the key-value pair
-    key_found = False
-    for i, line in enumerate(env_lines):
-        if line.strip().startswith(f"{key}="):
-            env_lines[i] = f"{key}={value}\n"
-            key_found = True
-            break
-    
-    if not key_found:
-        env_lines.append(f"{key}={value}\n")
-    
-    # Write back to .env file
-    try:
-        with open(env_file, 'w', encoding='utf-8') as f:
-            f.writelines(env_lines)
-        return True
-    except Exception as e:
-        print(f"❌ Error updating .env file: {e}")
-        return False
+    return update_private_config({key: value}, project_root)
 
 
 def get_combined_config(project_root: str = None) -> Dict[str, Any]:
@@ -644,7 +720,11 @@ def get_combined_config(project_root: str = None) -> Dict[str, Any]:
 
 
 def update_public_config(updates: Dict[str, Any], project_root: str = None) -> bool:
-    """Update public configuration in config.json"""
+    """Update public configuration in config.json
+    
+    The merge runs on the cached parsed config, and the result is written
+    back in a single atomic replace.
+    """
     config = load_config_file(project_root)
     
     # Deep merge updates
@@ -661,11 +741,55 @@ def update_public_config(updates: Dict[str, Any], project_root: str = None) -> b
 
 
 def update_private_config(updates: Dict[str, str], project_root: str = None) -> bool:
-    """Update private configuration in .env file"""
+    """Update private configuration in .env file
+    
+    All keys are applied in one read and one atomic write of the file.
+    """
+    if not updates:
+        return True
+    
+    if project_root is None:
+        project_root = get_project_root()
+    
+    env_file = os.path.join(project_root, '.env')
+    
+    # Read existing .env file
+    env_lines = []
+    if os.path.exists(env_file):
+        with open(env_file, 'r', encoding='utf-8') as f:
+            env_lines = f.readlines()
+    
+    # Update existing keys in place, then append any that weren't found
+    pending = dict(updates)
+    for i, line in enumerate(env_lines):
+        key = line.strip().split('=', 1)[0]
+        if key in pending and '=' in line:
+            env_lines[i] = f"{key}={pending.pop(key)}\n"
+    
+    for key, value in pending.items():
+        env_lines.append(f"{key}={value}\n")
+    
+    # Write back to .env file
+    try:
+        _write_file_atomic(env_file, ''.join(env_lines).encode('utf-8'))
+        _ENV_CACHE.pop(env_file, None)
+        return True
+    except Exception as e:
+        print(f"❌ Error updating .env file: {e}")
+        return False
+
+
+def update_config_bulk(public: Dict[str, Any] = None, private: Dict[str, str] = None,
+                       project_root: str = None) -> bool:
+    """Update public (config.json) and private (.env) settings together
+    
+    Each file is written at most once, and not at all if it has no updates.
+    """
     success = True
-    for key, value in updates.items():
-        if not set_env_value(key, value, project_root):
-            success = False
+    if private:
+        success = update_private_config(private, project_root) and success
+    if public:
+        success = update_public_config(public, project_root) and success
     return success
 
 
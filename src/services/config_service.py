@@ -7,6 +7,7 @@ Supports two-file configuration system:
 """
 
 import os
+import copy
 import json
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
@@ -14,6 +15,9 @@ from src.config.config_manager import (
     load_env_file, load_config_file, save_config_file,
     update_public_config, update_private_config, get_combined_config
 )
+
+# Environment variables the flattened config reads via get_combined_config
+_CONFIG_ENV_KEYS = ('WEB_PORT',)
     
 class ConfigService:
     """Service for handling configuration management"""
@@ -23,11 +27,37 @@ class ConfigService:
         self.env_file = os.path.join(project_root, '.env')
         self.config_file = os.path.join(project_root, 'config.json')
         
+        # Flattened config from get_config() with the file stats and
+        # environment values it was built from
+        self._config_cache = None
+        
         # Load environment variables
         load_env_file(project_root)
     
+    def _config_signature(self) -> tuple:
+        """(st_mtime_ns, st_size) of .env and config.json (None for a missing
+        file), followed by the current values of _CONFIG_ENV_KEYS"""
+        signature = []
+        for path in (self.env_file, self.config_file):
+            try:
+                st = os.stat(path)
+                signature.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                signature.append(None)
+        signature.extend(os.environ.get(key) for key in _CONFIG_ENV_KEYS)
+        return tuple(signature)
+    
     def get_config(self) -> Dict[str, Any]:
-        """Get combined configuration from both .env and config.json"""
+        """Get combined configuration from both .env and config.json
+        
+        The flattened view is cached until either file changes on disk, one
+        of the environment variables it reads changes, or update_config() is
+        called.
+        """
+        signature = self._config_signature()
+        if self._config_cache is not None and self._config_cache[0] == signature:
+            return copy.deepcopy(self._config_cache[1])
+        
         # Get combined configuration
         combined = get_combined_config(self.project_root)
         
@@ -58,7 +88,8 @@ class ConfigService:
             'GENERATE_SUMMARIES': analysis_features.get('generate_summaries', True)
         })
         
-        return config
+        self._config_cache = (signature, config)
+        return copy.deepcopy(config)
     
     def update_config(self, config_data: Dict[str, Any]) -> bool:
         """Update configuration in appropriate files"""
@@ -113,6 +144,7 @@ class ConfigService:
             
             # Reload environment variables
             load_env_file(self.project_root)
+            self._config_cache = None
             
             print("Configuration updated successfully")
             return True
@@ -279,7 +279,7 @@ def handle_errors(category: ErrorCategory = ErrorCategory.UNKNOWN,
             context = ErrorContext(func.__name__, category)
             context.max_retries = max_retries
             
-            handler = ErrorHandler()
+            handler = get_global_error_handler()
             
             if fallback:
                 return handler.safe_execute(func, context, fallback, *args, **kwargs)
@@ -294,7 +294,7 @@ def handle_errors(category: ErrorCategory = ErrorCategory.UNKNOWN,
 def error_context(operation: str, category: ErrorCategory = ErrorCategory.UNKNOWN):
     """Context manager for error handling"""
     context = ErrorContext(operation, category)
-    handler = ErrorHandler()
+    handler = get_global_error_handler()
     
     try:
         yield context
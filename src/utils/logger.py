@@ -20,7 +20,7 @@ import json
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional, Callable
-from functools import wraps
+from functools import lru_cache, wraps
 from contextlib import contextmanager
 
 # Fix Unicode encoding issues on Windows
@@ -272,23 +272,34 @@ class AppLogger:
 
 
 def get_logger(name: str = None, config: Dict[str, Any] = None) -> AppLogger:
-    """Get a logger instance"""
+    """Get a logger instance
+    
+    Loggers built from the environment defaults are cached per name, so
+    repeated calls return the same instance. Passing a config always builds
+    a new one.
+    """
     if name is None:
         name = 'clip_analysis'
     
-    # Load config from environment if not provided
     if config is None:
-        config = {
-            'log_level': os.getenv('LOG_LEVEL', 'INFO'),  # Keep direct os.getenv for logger config
-            'log_file': os.getenv('LOG_FILE', 'app.log'),  # Keep direct os.getenv for logger config
-            'error_log_file': os.getenv('ERROR_LOG_FILE', 'errors.log'),  # Keep direct os.getenv for logger config
-            'max_size': int(os.getenv('LOG_MAX_SIZE', 10 * 1024 * 1024)),  # Keep direct os.getenv for logger config
-            'backup_count': int(os.getenv('LOG_BACKUP_COUNT', 5))
-        }
+        return _get_default_logger(name)
     
     return AppLogger(name, config)
 
 
+@lru_cache(maxsize=None)
+def _get_default_logger(name: str) -> AppLogger:
+    """Build a logger configured from the environment"""
+    config = {
+        'log_level': os.getenv('LOG_LEVEL', 'INFO'),  # Keep direct os.getenv for logger config
+        'log_file': os.getenv('LOG_FILE', 'app.log'),  # Keep direct os.getenv for logger config
+        'error_log_file': os.getenv('ERROR_LOG_FILE', 'errors.log'),  # Keep direct os.getenv for logger config
+        'max_size': int(os.getenv('LOG_MAX_SIZE', 10 * 1024 * 1024)),  # Keep direct os.getenv for logger config
+        'backup_count': int(os.getenv('LOG_BACKUP_COUNT', 5))
+    }
+    return AppLogger(name, config)
+
+
 def log_function_calls(logger: AppLogger = None):
     """Decorator to log function calls"""
     if logger is None:
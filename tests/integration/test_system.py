@@ -73,8 +73,12 @@ def test_directories():
     directories = ["Images", "Output"]
     all_good = True
     
+    # One directory listing instead of a stat per expected directory
+    with os.scandir(".") as entries:
+        present = frozenset(entry.name for entry in entries if entry.is_dir())
+    
     for directory in directories:
-        if os.path.exists(directory):
+        if directory in present:
             print(f"✅ {directory}")
         else:
             print(f"❌ {directory} (missing)")
@@ -18,9 +18,6 @@ import shutil
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 import pytest
 from flask import Flask
 from flask.testing import FlaskClient
@@ -13,9 +13,6 @@ from unittest.mock import patch, MagicMock
 import sys
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 from src.viewers.web_interface import app
 
 class TestWebInterfaceIntegration(unittest.TestCase):
@@ -18,9 +18,6 @@ import shutil
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 import pytest
 from flask import Flask
 from flask.testing import FlaskClient
@@ -128,7 +125,7 @@ WEB_PORT=5050
         
         # Test config loading
         with patch.dict(os.environ, {}, clear=True):
-            with patch('src.config.config_manager.load_dotenv'):
+            with patch('src.config.config_manager.dotenv_values'):
                 # Test that .env file can be read
                 assert os.path.exists(env_file)
                 
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Concurrent CLI command runner for the misc CLI test scripts
+
+Drives many subprocesses from a single thread by multiplexing their stderr
+pipes with a selector, instead of parking one thread per subprocess.
+stdout is discarded since the CLI tests only look at the exit code.
+"""
+
+import io
+import os
+import selectors
+import subprocess
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+MAX_PROCS = os.cpu_count() or 4
+
+# Only this much stderr is kept per command for failure messages
+STDERR_LIMIT = 512
+
+# main.py subcommands and flags whose runs change shared state (config files,
+# the database, output directories) or bind a port
+STATEFUL_SUBCOMMANDS = frozenset({'process', 'web', 'wildcard'})
+STATEFUL_FLAGS = frozenset({'--setup', '--reset', '--backup', '--clear', '--add-ollama', '--add-openai'})
+
+
+class OutputBuffer:
+    """Collects report lines in memory and writes them to stdout in one go"""
+
+    def __init__(self):
+        self._buffer = io.StringIO()
+
+    def __call__(self, message=""):
+        self._buffer.write(message)
+        self._buffer.write("\n")
+
+    def flush(self):
+        """Write everything collected so far and reset the buffer"""
+        sys.stdout.write(self._buffer.getvalue())
+        sys.stdout.flush()
+        self._buffer = io.StringIO()
+
+
+def show_progress(done, total):
+    """Redraw a single in-place progress counter line"""
+    sys.stdout.write("\r%d/%d\x1b[K" % (done, total))
+    if done == total:
+        sys.stdout.write("\r\x1b[K")
+    sys.stdout.flush()
+
+
+def is_stateful(cli_args):
+    """True if main.py run with cli_args changes shared state or binds a port"""
+    subcommand = next((arg for arg in cli_args if not arg.startswith('-')), None)
+    return subcommand in STATEFUL_SUBCOMMANDS or not STATEFUL_FLAGS.isdisjoint(cli_args)
+
+
+def run_commands_ordered(commands, stateful, progress=None, **kwargs):
+    """
+    Run commands in order, overlapping only consecutive read-only ones.
+
+    Each stateful command runs on its own, after everything before it has
+    finished and before anything after it starts, so every command sees the
+    same state it would in a fully serial run.
+
+    Args:
+        commands: Iterable of (key, command, timeout) tuples, in run order
+        stateful: Predicate on a key, True for commands that must run alone
+        progress: Optional callback invoked as progress(done, total)
+        **kwargs: Passed through to run_commands
+
+    Returns:
+        Dict mapping key to (returncode, stderr_bytes), as run_commands
+    """
+    commands = list(commands)
+    total = len(commands)
+    results = {}
+
+    def batch_progress(done, _):
+        if progress:
+            progress(len(results) + done, total)
+
+    batch = []
+    for command in commands + [None]:
+        if command is not None and not stateful(command[0]):
+            batch.append(command)
+            continue
+        if batch:
+            results.update(run_commands(batch, progress=batch_progress, **kwargs))
+            batch = []
+        if command is not None:
+            results.update(run_commands([command], progress=batch_progress, **kwargs))
+
+    return results
+
+
+def run_commands(commands, max_procs=MAX_PROCS, shell=False, env=None, progress=None):
+    """
+    Run commands concurrently and collect their results.
+
+    Args:
+        commands: Iterable of (key, command, timeout) tuples
+        max_procs: Maximum number of subprocesses alive at once
+        shell: Passed through to subprocess.Popen
+        env: Environment for the subprocesses
+        progress: Optional callback invoked as progress(done, total) after
+            each command finishes
+
+    Returns:
+        Dict mapping key to (returncode, stderr_bytes). returncode is None
+        when the command timed out.
+    """
+    commands = list(commands)
+    total = len(commands)
+
+    if sys.platform == 'win32':
+        # Selectors only support sockets on Windows, fall back to threads
+        return _run_commands_threaded(commands, max_procs, shell, env, progress)
+
+    pending = deque(commands)
+    running = {}
+    results = {}
+
+    def finish(key, returncode, stderr):
+        results[key] = (returncode, stderr)
+        if progress:
+            progress(len(results), total)
+
+    with selectors.DefaultSelector() as selector:
+        while pending or running:
+            # Refill free slots from the pending queue
+            while pending and len(running) < max_procs:
+                key, command, timeout = pending.popleft()
+                try:
+                    proc = subprocess.Popen(
+                        command,
+                        shell=shell,
+                        env=env,
+                        stdin=subprocess.DEVNULL,
+                        stdout=subprocess.DEVNULL,
+                        stderr=subprocess.PIPE
+                    )
+                except OSError as e:
+                    finish(key, -1, str(e).encode('utf-8'))
+                    continue
+                running[key] = (proc, time.monotonic() + timeout, bytearray())
+                selector.register(proc.stderr, selectors.EVENT_READ, data=key)
+
+            if not running:
+                continue
+
+            next_deadline = min(deadline for _, deadline, _ in running.values())
+            for selector_key, _ in selector.select(timeout=max(0, next_deadline - time.monotonic())):
+                key = selector_key.data
+                proc, deadline, stderr = running[key]
+                chunk = os.read(selector_key.fd, 65536)
+                if chunk:
+                    if len(stderr) < STDERR_LIMIT:
+                        stderr.extend(chunk[:STDERR_LIMIT - len(stderr)])
+                    continue
+
+                # stderr closed, reap the process
+                selector.unregister(proc.stderr)
+                proc.stderr.close()
+                del running[key]
+                try:
+                    returncode = proc.wait(timeout=max(0, deadline - time.monotonic()))
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+                    returncode = None
+                finish(key, returncode, bytes(stderr))
+
+            # Kill anything past its deadline
+            now = time.monotonic()
+            for key in [k for k, (_, deadline, _) in running.items() if deadline <= now]:
+                proc, _, stderr = running.pop(key)
+                proc.kill()
+                selector.unregister(proc.stderr)
+                proc.stderr.close()
+                proc.wait()
+                finish(key, None, bytes(stderr))
+
+    return results
+
+
+def _run_commands_threaded(commands, max_procs, shell, env, progress):
+    """Thread-per-command fallback used where pipes can't be selected"""
+    def run_one(command, timeout):
+        try:
+            result = subprocess.run(
+                command,
+                shell=shell,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                timeout=timeout
+            )
+            return result.returncode, result.stderr[:STDERR_LIMIT]
+        except subprocess.TimeoutExpired:
+            return None, b""
+        except OSError as e:
+            return -1, str(e).encode('utf-8')
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_procs) as executor:
+        futures = {executor.submit(run_one, command, timeout): key for key, command, timeout in commands}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if progress:
+                progress(len(results), len(futures))
+    return results
@@ -0,0 +1,39 @@
+"""
+Pytest configuration for the misc test scripts
+"""
+
+import os
+import tempfile
+
+import pytest
+
+# RAM-backed filesystem used for temporary directories when available
+RAM_TMPDIR = '/dev/shm'
+
+# Only use it with this much free space; container /dev/shm is often just 64MB
+RAM_TMPDIR_MIN_FREE = 128 * 1024 * 1024
+
+
+def _ram_tmpdir():
+    """Return RAM_TMPDIR if it is writable and has room to spare, else None"""
+    try:
+        st = os.statvfs(RAM_TMPDIR)
+    except (AttributeError, OSError):  # No statvfs on Windows, or no /dev/shm
+        return None
+    if st.f_bavail * st.f_frsize < RAM_TMPDIR_MIN_FREE or not os.access(RAM_TMPDIR, os.W_OK):
+        return None
+    return RAM_TMPDIR
+
+
+@pytest.fixture(autouse=True)
+def ram_tempdir(monkeypatch):
+    """Keep tempfile's temp dirs in RAM instead of on disk for misc tests
+
+    The config and file tests only write a few small files, so there's no
+    reason for them to pay for block device writes. monkeypatch restores
+    tempfile.tempdir afterwards, so unit and integration tests in the same
+    session are unaffected.
+    """
+    ram_dir = _ram_tmpdir()
+    if ram_dir is not None:
+        monkeypatch.setattr(tempfile, "tempdir", ram_dir)
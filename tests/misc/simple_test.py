@@ -5,33 +5,43 @@ Simple test to check basic functionality without any server startup
 
 import sys
 import os
+import importlib
 
 # Add the project root to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Modules are imported one at a time on purpose: they import each other
+# (e.g. via src.utils.logger), and importing them from several threads at
+# once intermittently fails with a _ModuleLock deadlock
+BASIC_MODULES = (
+    "src.config.config_manager",
+    "src.database.db_manager",
+    "src.analyzers.llm_manager",
+    "src.analyzers.metadata_extractor",
+    "src.utils.installer",
+    "src.viewers.results_viewer",
+)
+
+SERVICE_MODULES = (
+    "src.services.analysis_service",
+    "src.services.image_service",
+    "src.services.config_service",
+)
+
+ROUTE_MODULES = (
+    "src.routes.main_routes",
+    "src.routes.api_routes",
+)
+
 def test_basic_imports():
     """Test basic imports without any server startup"""
     print("Testing basic imports...")
     
     try:
         # Test basic modules
-        import src.config.config_manager
-        print("✅ config_manager imported")
-        
-        import src.database.db_manager
-        print("✅ db_manager imported")
-        
-        import src.analyzers.llm_manager
-        print("✅ llm_manager imported")
-        
-        import src.analyzers.metadata_extractor
-        print("✅ metadata_extractor imported")
-        
-        import src.utils.installer
-        print("✅ installer imported")
-        
-        import src.viewers.results_viewer
-        print("✅ results_viewer imported")
+        for module_name in BASIC_MODULES:
+            importlib.import_module(module_name)
+            print(f"✅ {module_name.rsplit('.', 1)[-1]} imported")
         
         print("\n✅ All basic imports successful!")
         return True
@@ -45,14 +55,9 @@ def test_service_imports():
     print("\nTesting service imports...")
     
     try:
-        import src.services.analysis_service
-        print("✅ analysis_service imported")
-        
-        import src.services.image_service
-        print("✅ image_service imported")
-        
-        import src.services.config_service
-        print("✅ config_service imported")
+        for module_name in SERVICE_MODULES:
+            importlib.import_module(module_name)
+            print(f"✅ {module_name.rsplit('.', 1)[-1]} imported")
         
         print("✅ All service imports successful!")
         return True
@@ -66,11 +71,9 @@ def test_route_imports():
     print("\nTesting route imports...")
     
     try:
-        import src.routes.main_routes
-        print("✅ main_routes imported")
-        
-        import src.routes.api_routes
-        print("✅ api_routes imported")
+        for module_name in ROUTE_MODULES:
+            importlib.import_module(module_name)
+            print(f"✅ {module_name.rsplit('.', 1)[-1]} imported")
         
         print("✅ All route imports successful!")
         return True
@@ -6,269 +6,241 @@ Handles Unicode encoding issues on Windows
 
 import subprocess
 import sys
-import time
 import os
+from collections import Counter
 from pathlib import Path
 
-def run_command_with_unicode_fix(command, timeout=30):
-    """Run command with proper Unicode handling"""
+# cli_runner lives next to this file; put it on the path when run on its own
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cli_runner import OutputBuffer, is_stateful, run_commands_ordered, show_progress
+
+# Report lines are buffered and written once per suite / run
+out = OutputBuffer()
+
+# Each suite is a tuple of (name, command, expect_success) tuples, built once
+TESTS_GLOBAL_FLAGS = (
+    ("Global help", "python main.py --help", True),
+    ("Config with yes flag", "python main.py config --no-interactive --yes --show", True),
+    ("No command with no-interactive", "python main.py --no-interactive", False),
+)
+
+TESTS_PROCESS = (
+    ("Basic process with no-interactive flag", "python main.py process --no-interactive", True),
+    ("Process with all features disabled", "python main.py process --no-interactive --disable-clip --disable-llm --disable-metadata --disable-parallel --disable-summaries", True),
+    ("Process with non-existent input directory", "python main.py process --no-interactive --input nonexistent_directory", False),
+)
+
+TESTS_CONFIG = (
+    ("Show configuration", "python main.py config --no-interactive --show", True),
+    ("Validate configuration", "python main.py config --no-interactive --validate", True),
+)
+
+TESTS_LLM_CONFIG = (
+    ("List available models", "python main.py llm-config --no-interactive --list", True),
+    ("List configured models", "python main.py llm-config --no-interactive --list-configured", True),
+    ("Test Ollama connection", "python main.py llm-config --no-interactive --test-ollama", True),
+    ("Test all connections", "python main.py llm-config --no-interactive --test-all", True),
+)
+
+TESTS_VIEW = (
+    ("List results", "python main.py view --no-interactive --list", True),
+    ("Generate summary", "python main.py view --no-interactive --summary", True),
+    ("Export to CSV", "python main.py view --no-interactive --export csv --output test_export.csv", True),
+    ("Export to JSON", "python main.py view --no-interactive --export json --output test_export.json", True),
+)
+
+TESTS_DATABASE = (
+    ("Show database stats", "python main.py database --no-interactive --stats", True),
+)
+
+ALL_TESTS = {
+    "Global Flags": TESTS_GLOBAL_FLAGS,
+    "Process Command": TESTS_PROCESS,
+    "Config Command": TESTS_CONFIG,
+    "LLM Config Command": TESTS_LLM_CONFIG,
+    "View Command": TESTS_VIEW,
+    "Database Command": TESTS_DATABASE,
+}
+
+# Per-suite command timeouts in seconds (default 30)
+SUITE_TIMEOUTS = {
+    "Process Command": 10,
+}
+
+def run_command_with_unicode_fix(command, timeout=30, capture=False):
+    """Run command with proper Unicode handling
+
+    stdout is discarded unless ``capture`` is set, since most callers only
+    check the exit code. stderr is always kept, but only its first 512 bytes
+    are decoded for the failure message.
+    """
     try:
-        # Use UTF-8 encoding and handle Unicode properly
+        env = {**os.environ, 'PYTHONIOENCODING': 'utf-8'}
+        if capture:
+            # Use UTF-8 encoding and handle Unicode properly
+            result = subprocess.run(
+                command,
+                shell=True,
+                capture_output=True,
+                text=True,
+                encoding='utf-8',
+                errors='replace',  # Replace problematic characters
+                timeout=timeout,
+                env=env
+            )
+            return result.returncode, result.stdout, result.stderr
+
         result = subprocess.run(
             command,
             shell=True,
-            capture_output=True,
-            text=True,
-            encoding='utf-8',
-            errors='replace',  # Replace problematic characters
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             timeout=timeout,
-            env={**os.environ, 'PYTHONIOENCODING': 'utf-8'}
+            env=env
         )
-        return result.returncode, result.stdout, result.stderr
+        stderr = result.stderr[:512].decode('utf-8', errors='replace')
+        return result.returncode, "", stderr
     except subprocess.TimeoutExpired:
         return -1, "", "Command timed out"
     except Exception as e:
         return -1, "", str(e)
 
-def test_global_flags():
-    """Test global flags"""
-    print("📊 Running Global Flags Tests")
-    print("-" * 40)
-    
-    tests = [
-        ("Global help", "python main.py --help"),
-        ("Config with yes flag", "python main.py config --no-interactive --yes --show"),
-        ("No command with no-interactive", "python main.py --no-interactive")
-    ]
-    
+def run_test(test_name, command, expect_success=True, timeout=30):
+    """Run a single CLI test and return (passed, output_lines)"""
+    exit_code, stdout, stderr = run_command_with_unicode_fix(command, timeout=timeout)
+    return check_result(test_name, command, expect_success, exit_code, stderr)
+
+def check_result(test_name, command, expect_success, exit_code, stderr):
+    """Judge a finished CLI test and return (passed, output_lines)"""
+    lines = [f"🧪 Testing: {test_name}", f"   Command: {command}"]
+
+    if exit_code == 0:
+        lines.append("   ✅ SUCCESS")
+        return True, lines
+    if not expect_success:
+        lines.append("   ✅ EXPECTED FAILURE")
+        return True, lines
+
+    lines.append(f"   ❌ FAILED (exit code: {exit_code})")
+    if stderr:
+        lines.append(f"   Error: {stderr[:200]}...")
+    return False, lines
+
+def run_suite(suite_name, tests):
+    """Run one suite sequentially and return (passed, failed)"""
+    out(f"📊 Running {suite_name} Tests")
+    out("-" * 40)
+
+    timeout = SUITE_TIMEOUTS.get(suite_name, 30)
     passed = 0
     failed = 0
-    
-    for test_name, command in tests:
-        print(f"🧪 Testing: {test_name}")
-        print(f"   Command: {command}")
-        
-        exit_code, stdout, stderr = run_command_with_unicode_fix(command)
-        
-        if exit_code == 0:
-            print("   ✅ SUCCESS")
-            passed += 1
-        elif test_name == "No command with no-interactive" and exit_code != 0:
-            print("   ✅ EXPECTED FAILURE")
+
+    for test_name, command, expect_success in tests:
+        ok, lines = run_test(test_name, command, expect_success, timeout)
+        out("\n".join(lines))
+        if ok:
             passed += 1
         else:
-            print(f"   ❌ FAILED (exit code: {exit_code})")
-            if stderr:
-                print(f"   Error: {stderr[:200]}...")
             failed += 1
-    
-    print(f"Global Flags: {passed} passed, {failed} failed")
+
+    out(f"{suite_name}: {passed} passed, {failed} failed")
+    out.flush()
     return passed, failed
 
+def test_global_flags():
+    """Test global flags"""
+    return run_suite("Global Flags", TESTS_GLOBAL_FLAGS)
+
 def test_process_command():
     """Test process command"""
-    print("\n📊 Running Process Command Tests")
-    print("-" * 40)
-    
-    tests = [
-        ("Basic process with no-interactive flag", "python main.py process --no-interactive"),
-        ("Process with all features disabled", "python main.py process --no-interactive --disable-clip --disable-llm --disable-metadata --disable-parallel --disable-summaries"),
-        ("Process with non-existent input directory", "python main.py process --no-interactive --input nonexistent_directory")
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test_name, command in tests:
-        print(f"🧪 Testing: {test_name}")
-        print(f"   Command: {command}")
-        
-        exit_code, stdout, stderr = run_command_with_unicode_fix(command, timeout=10)
-        
-        if exit_code == 0:
-            print("   ✅ SUCCESS")
-            passed += 1
-        elif test_name == "Process with non-existent input directory" and exit_code != 0:
-            print("   ✅ EXPECTED FAILURE")
-            passed += 1
-        else:
-            print(f"   ❌ FAILED (exit code: {exit_code})")
-            if stderr:
-                print(f"   Error: {stderr[:200]}...")
-            failed += 1
-    
-    print(f"Process Command: {passed} passed, {failed} failed")
-    return passed, failed
+    return run_suite("Process Command", TESTS_PROCESS)
 
 def test_config_command():
     """Test config command"""
-    print("\n📊 Running Config Command Tests")
-    print("-" * 40)
-    
-    tests = [
-        ("Show configuration", "python main.py config --no-interactive --show"),
-        ("Validate configuration", "python main.py config --no-interactive --validate")
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test_name, command in tests:
-        print(f"🧪 Testing: {test_name}")
-        print(f"   Command: {command}")
-        
-        exit_code, stdout, stderr = run_command_with_unicode_fix(command)
-        
-        if exit_code == 0:
-            print("   ✅ SUCCESS")
-            passed += 1
-        else:
-            print(f"   ❌ FAILED (exit code: {exit_code})")
-            if stderr:
-                print(f"   Error: {stderr[:200]}...")
-            failed += 1
-    
-    print(f"Config Command: {passed} passed, {failed} failed")
-    return passed, failed
+    return run_suite("Config Command", TESTS_CONFIG)
 
 def test_llm_config_command():
     """Test LLM config command"""
-    print("\n📊 Running LLM Config Command Tests")
-    print("-" * 40)
-    
-    tests = [
-        ("List available models", "python main.py llm-config --no-interactive --list"),
-        ("List configured models", "python main.py llm-config --no-interactive --list-configured"),
-        ("Test Ollama connection", "python main.py llm-config --no-interactive --test-ollama"),
-        ("Test all connections", "python main.py llm-config --no-interactive --test-all")
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test_name, command in tests:
-        print(f"🧪 Testing: {test_name}")
-        print(f"   Command: {command}")
-        
-        exit_code, stdout, stderr = run_command_with_unicode_fix(command)
-        
-        if exit_code == 0:
-            print("   ✅ SUCCESS")
-            passed += 1
-        else:
-            print(f"   ❌ FAILED (exit code: {exit_code})")
-            if stderr:
-                print(f"   Error: {stderr[:200]}...")
-            failed += 1
-    
-    print(f"LLM Config Command: {passed} passed, {failed} failed")
-    return passed, failed
+    return run_suite("LLM Config Command", TESTS_LLM_CONFIG)
 
 def test_view_command():
     """Test view command"""
-    print("\n📊 Running View Command Tests")
-    print("-" * 40)
-    
-    tests = [
-        ("List results", "python main.py view --no-interactive --list"),
-        ("Generate summary", "python main.py view --no-interactive --summary"),
-        ("Export to CSV", "python main.py view --no-interactive --export csv --output test_export.csv"),
-        ("Export to JSON", "python main.py view --no-interactive --export json --output test_export.json")
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test_name, command in tests:
-        print(f"🧪 Testing: {test_name}")
-        print(f"   Command: {command}")
-        
-        exit_code, stdout, stderr = run_command_with_unicode_fix(command)
-        
-        if exit_code == 0:
-            print("   ✅ SUCCESS")
-            passed += 1
-        else:
-            print(f"   ❌ FAILED (exit code: {exit_code})")
-            if stderr:
-                print(f"   Error: {stderr[:200]}...")
-            failed += 1
-    
-    print(f"View Command: {passed} passed, {failed} failed")
-    return passed, failed
+    return run_suite("View Command", TESTS_VIEW)
 
 def test_database_command():
     """Test database command"""
-    print("\n📊 Running Database Command Tests")
-    print("-" * 40)
-    
-    tests = [
-        ("Show database stats", "python main.py database --no-interactive --stats")
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for test_name, command in tests:
-        print(f"🧪 Testing: {test_name}")
-        print(f"   Command: {command}")
-        
-        exit_code, stdout, stderr = run_command_with_unicode_fix(command)
-        
-        if exit_code == 0:
-            print("   ✅ SUCCESS")
-            passed += 1
-        else:
-            print(f"   ❌ FAILED (exit code: {exit_code})")
-            if stderr:
-                print(f"   Error: {stderr[:200]}...")
-            failed += 1
-    
-    print(f"Database Command: {passed} passed, {failed} failed")
-    return passed, failed
+    return run_suite("Database Command", TESTS_DATABASE)
 
 def main():
     """Run all CLI tests"""
-    print("🧪 Fixed CLI Non-Interactive Mode Tests")
-    print("=" * 60)
-    print("Testing that CLI can run completely non-interactively")
-    print("with all options provided via command-line arguments.")
-    print("Fixed for Unicode encoding issues on Windows.")
-    print()
-    
-    total_passed = 0
-    total_failed = 0
-    
-    # Run all test suites
-    test_suites = [
-        ("Global Flags", test_global_flags),
-        ("Process Command", test_process_command),
-        ("Config Command", test_config_command),
-        ("LLM Config Command", test_llm_config_command),
-        ("View Command", test_view_command),
-        ("Database Command", test_database_command)
-    ]
-    
-    for suite_name, test_func in test_suites:
-        print(f"\n📋 Testing {suite_name}")
-        print("=" * 50)
-        passed, failed = test_func()
-        total_passed += passed
-        total_failed += failed
-    
-    print("\n" + "=" * 60)
-    print("📊 Final Test Results")
-    print("=" * 60)
-    print(f"✅ Total Passed: {total_passed}")
-    print(f"❌ Total Failed: {total_failed}")
-    print(f"🎯 Total Tests: {total_passed + total_failed}")
-    
+    out("🧪 Fixed CLI Non-Interactive Mode Tests")
+    out("=" * 60)
+    out("Testing that CLI can run completely non-interactively")
+    out("with all options provided via command-line arguments.")
+    out("Fixed for Unicode encoding issues on Windows.")
+    out()
+    out.flush()
+
+    # Run every test from every suite in definition order; read-only commands
+    # between two stateful ones (writes, port binds) run concurrently
+    tests = {
+        (suite_name, index): (test_name, command, expect_success)
+        for suite_name, suite_tests in ALL_TESTS.items()
+        for index, (test_name, command, expect_success) in enumerate(suite_tests)
+    }
+    results = run_commands_ordered(
+        [(key, command, SUITE_TIMEOUTS.get(key[0], 30)) for key, (_, command, _) in tests.items()],
+        # Commands are "python main.py <args>"
+        stateful=lambda key: is_stateful(tests[key][1].split()[2:]),
+        shell=True,
+        env={**os.environ, 'PYTHONIOENCODING': 'utf-8'},
+        progress=show_progress
+    )
+
+    passed = Counter()
+    failed = Counter()
+    outputs = {suite_name: [] for suite_name in ALL_TESTS}
+
+    for (suite_name, index), (test_name, command, expect_success) in tests.items():
+        exit_code, stderr = results[(suite_name, index)]
+        if exit_code is None:
+            exit_code, stderr = -1, "Command timed out"
+        else:
+            stderr = stderr.decode('utf-8', errors='replace')
+        ok, lines = check_result(test_name, command, expect_success, exit_code, stderr)
+        if ok:
+            passed[suite_name] += 1
+        else:
+            failed[suite_name] += 1
+        outputs[suite_name].append((index, lines))
+
+    # Print results grouped by suite, in definition order
+    for suite_name in ALL_TESTS:
+        out(f"\n📋 Testing {suite_name}")
+        out("=" * 50)
+        for _, lines in sorted(outputs[suite_name]):
+            out("\n".join(lines))
+        out(f"{suite_name}: {passed[suite_name]} passed, {failed[suite_name]} failed")
+
+    total_passed = sum(passed.values())
+    total_failed = sum(failed.values())
+
+    out("\n" + "=" * 60)
+    out("📊 Final Test Results")
+    out("=" * 60)
+    out(f"✅ Total Passed: {total_passed}")
+    out(f"❌ Total Failed: {total_failed}")
+    out(f"🎯 Total Tests: {total_passed + total_failed}")
+
     if total_failed == 0:
-        print("\n🎉 All tests passed! CLI is working correctly.")
+        out("\n🎉 All tests passed! CLI is working correctly.")
+        out.flush()
         return 0
     else:
-        print(f"\n⚠️  {total_failed} test(s) failed. Check the output above for details.")
+        out(f"\n⚠️  {total_failed} test(s) failed. Check the output above for details.")
+        out.flush()
         return 1
 
 if __name__ == "__main__":
-    exit(main()) 
\ No newline at end of file
+    exit(main())
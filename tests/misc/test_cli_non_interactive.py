@@ -7,62 +7,50 @@ with all options provided via command-line arguments.
 """
 
 import sys
-import os
+import atexit
+import base64
 import subprocess
 import tempfile
 import shutil
+from collections import Counter
 from pathlib import Path
 
-def run_cli_command(cmd_args, description, expect_success=True):
-    """Run a CLI command and check the result"""
-    print(f"🧪 Testing: {description}")
-    print(f"   Command: python main.py {' '.join(cmd_args)}")
-    
-    try:
-        result = subprocess.run(
-            [sys.executable, 'main.py'] + cmd_args,
-            capture_output=True,
-            text=True,
-            timeout=30  # 30 second timeout
-        )
-        
-        if expect_success:
-            if result.returncode == 0:
-                print("   ✅ SUCCESS")
-                return True
-            else:
-                print(f"   ❌ FAILED (exit code: {result.returncode})")
-                if result.stderr:
-                    print(f"   Error: {result.stderr}")
-                return False
-        else:
-            if result.returncode != 0:
-                print("   ✅ EXPECTED FAILURE")
-                return True
-            else:
-                print("   ❌ UNEXPECTED SUCCESS")
-                return False
-                
-    except subprocess.TimeoutExpired:
-        print("   ❌ TIMEOUT")
-        return False
-    except Exception as e:
-        print(f"   ❌ EXCEPTION: {e}")
-        return False
+# cli_runner lives next to this file; put it on the path when run on its own
+sys.path.insert(0, str(Path(__file__).parent))
 
-def test_process_command():
-    """Test process command with all options"""
-    print("\n📋 Testing Process Command")
-    print("=" * 50)
-    
-    tests = [
-        # Basic process with minimal options
-        (['process', '--no-interactive'], "Basic process with no-interactive flag", True),
-        
-        # Process with all options specified
-        (['process', '--no-interactive', 
-          '--input', 'Images', 
-          '--output', 'Output',
+from cli_runner import OutputBuffer, is_stateful, run_commands_ordered, show_progress
+
+# Report lines are buffered and written once per suite / run
+out = OutputBuffer()
+
+# 1x1 transparent PNG used as the only input image for the process tests
+_PIXEL_PNG = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=='
+)
+
+# Shared fixture directories, built once per run instead of in the CWD
+FIXTURE_DIR = Path(tempfile.mkdtemp(prefix='cli_tests_'))
+(FIXTURE_DIR / 'pixel.png').write_bytes(_PIXEL_PNG)
+OUTPUT_DIR = Path(tempfile.mkdtemp(prefix='cli_tests_output_'))
+atexit.register(shutil.rmtree, FIXTURE_DIR, ignore_errors=True)
+atexit.register(shutil.rmtree, OUTPUT_DIR, ignore_errors=True)
+
+# Each suite is a list of (description, cmd_args, expect_success) tuples
+ALL_TESTS = {
+    "Global Flags": [
+        ("Global help", ['--help'], True),
+        ("Process with verbose output", ['process', '--no-interactive', '--verbose'], True),
+        ("Process with quiet output", ['process', '--no-interactive', '--quiet'], True),
+        ("Config with yes flag", ['config', '--no-interactive', '--yes', '--show'], True),
+        # No command with --no-interactive should fail
+        ("No command with no-interactive", ['--no-interactive'], False),
+    ],
+    "Process Command": [
+        ("Basic process with no-interactive flag", ['process', '--no-interactive'], True),
+        ("Process with all options specified",
+         ['process', '--no-interactive',
+          '--input', str(FIXTURE_DIR),
+          '--output', str(OUTPUT_DIR),
           '--api-url', 'http://localhost:7860',
           '--clip-model', 'ViT-L-14/openai',
           '--clip-modes', 'best', 'fast',
@@ -75,323 +63,249 @@ def test_process_command():
           '--timeout', '120',
           '--retry-limit', '3',
           '--max-file-size', '50MB',
-          '--allowed-extensions', '.jpg', '.png'], 
-         "Process with all options specified", True),
-        
-        # Process with disabled features
-        (['process', '--no-interactive',
+          '--allowed-extensions', '.jpg', '.png'], True),
+        ("Process with all features disabled",
+         ['process', '--no-interactive',
           '--disable-clip',
           '--disable-llm',
           '--disable-metadata',
           '--disable-parallel',
-          '--disable-summaries'], 
-         "Process with all features disabled", True),
-        
-        # Process with custom settings
-        (['process', '--no-interactive',
-          '--input', 'test_images',
-          '--output', 'test_output',
+          '--disable-summaries'], True),
+        ("Process with custom settings",
+         ['process', '--no-interactive',
+          '--input', str(FIXTURE_DIR),
+          '--output', str(OUTPUT_DIR),
           '--clip-modes', 'best',
           '--prompt-choices', 'P1',
           '--timeout', '60',
-          '--retry-limit', '5'], 
-         "Process with custom settings", True),
-        
-        # Test missing required directory (should fail gracefully)
-        (['process', '--no-interactive',
-          '--input', 'nonexistent_directory'], 
-         "Process with non-existent input directory", False),
+          '--retry-limit', '5'], True),
+        # Missing input directory should fail gracefully
+        ("Process with non-existent input directory",
+         ['process', '--no-interactive', '--input', 'nonexistent_directory'], False),
+    ],
+    "Web Command": [
+        ("Basic web interface", ['web', '--no-interactive'], True),
+        ("Web with custom port and host",
+         ['web', '--no-interactive', '--port', '8080', '--host', '127.0.0.1'], True),
+        ("Web with debug mode", ['web', '--no-interactive', '--debug'], True),
+        ("Web with all options",
+         ['web', '--no-interactive', '--port', '9000', '--host', '0.0.0.0', '--debug'], True),
+    ],
+    "Config Command": [
+        ("Show configuration", ['config', '--no-interactive', '--show'], True),
+        ("Setup configuration", ['config', '--no-interactive', '--setup'], True),
+        ("Validate configuration", ['config', '--no-interactive', '--validate'], True),
+        ("Reset configuration", ['config', '--no-interactive', '--reset'], True),
+    ],
+    "LLM Config Command": [
+        ("List available models", ['llm-config', '--no-interactive', '--list'], True),
+        ("List configured models", ['llm-config', '--no-interactive', '--list-configured'], True),
+        ("Test Ollama connection", ['llm-config', '--no-interactive', '--test-ollama'], True),
+        ("Test OpenAI connection", ['llm-config', '--no-interactive', '--test-openai'], True),
+        ("Test all connections", ['llm-config', '--no-interactive', '--test-all'], True),
+        # These will fail without API keys, but should not hang
+        ("Add Ollama model", ['llm-config', '--no-interactive', '--add-ollama', 'llama2'], True),
+        ("Add OpenAI model with key",
+         ['llm-config', '--no-interactive', '--add-openai', 'gpt-4', '--openai-key', 'test_key'], True),
+    ],
+    "View Command": [
+        ("List results", ['view', '--no-interactive', '--list'], True),
+        ("Generate summary", ['view', '--no-interactive', '--summary'], True),
+        ("Export to CSV",
+         ['view', '--no-interactive', '--export', 'csv', '--output', 'test_export.csv'], True),
+        ("Export to JSON",
+         ['view', '--no-interactive', '--export', 'json', '--output', 'test_export.json'], True),
+    ],
+    "Database Command": [
+        ("Show database stats", ['database', '--no-interactive', '--stats'], True),
+        ("Backup database", ['database', '--no-interactive', '--backup', 'test_backup.db'], True),
+        # Clear should fail without confirmation in non-interactive mode
+        ("Clear database", ['database', '--no-interactive', '--clear'], False),
+    ],
+    "Wildcard Command": [
+        ("Generate all wildcards", ['wildcard', '--no-interactive', '--all'], True),
+        ("Generate individual groups", ['wildcard', '--no-interactive', '--groups'], True),
+        ("Generate combined wildcard", ['wildcard', '--no-interactive', '--combined'], True),
+        ("Generate combinations", ['wildcard', '--no-interactive', '--combinations'], True),
+        ("Generate with custom output",
+         ['wildcard', '--no-interactive', '--output', 'test_wildcards', '--all'], True),
+    ],
+}
+
+def run_cli_command(cmd_args, description, expect_success=True):
+    """Run a CLI command and check the result
+
+    Returns (passed, output_lines) so results from concurrent runs can be
+    printed grouped by suite.
+    """
+    try:
+        # Only the exit code matters, so stdout is discarded rather than decoded
+        result = subprocess.run(
+            [sys.executable, 'main.py'] + cmd_args,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=30  # 30 second timeout
+        )
+        return check_result(cmd_args, description, expect_success, result.returncode, result.stderr)
+    except subprocess.TimeoutExpired:
+        return check_result(cmd_args, description, expect_success, None, b"")
+    except Exception as e:
+        return False, _header(cmd_args, description) + [f"   ❌ EXCEPTION: {e}"]
+
+def _header(cmd_args, description):
+    """Output lines describing a test"""
+    return [
+        f"🧪 Testing: {description}",
+        f"   Command: python main.py {' '.join(cmd_args)}",
     ]
-    
+
+def check_result(cmd_args, description, expect_success, returncode, stderr):
+    """Judge a finished CLI command and return (passed, output_lines)
+
+    A returncode of None means the command timed out.
+    """
+    lines = _header(cmd_args, description)
+
+    if returncode is None:
+        lines.append("   ❌ TIMEOUT")
+        return False, lines
+
+    if expect_success:
+        if returncode == 0:
+            lines.append("   ✅ SUCCESS")
+            return True, lines
+        else:
+            lines.append(f"   ❌ FAILED (exit code: {returncode})")
+            if stderr:
+                lines.append(f"   Error: {stderr[:512].decode('utf-8', errors='replace')}")
+            return False, lines
+    else:
+        if returncode != 0:
+            lines.append("   ✅ EXPECTED FAILURE")
+            return True, lines
+        else:
+            lines.append("   ❌ UNEXPECTED SUCCESS")
+            return False, lines
+
+def run_suite(suite_name, tests):
+    """Run one suite sequentially and return (passed, failed)"""
+    out(f"\n📊 Running {suite_name} Tests")
+    out("-" * 40)
+
     passed = 0
     failed = 0
-    
-    for cmd_args, description, expect_success in tests:
-        if run_cli_command(cmd_args, description, expect_success):
+
+    for description, cmd_args, expect_success in tests:
+        ok, lines = run_cli_command(cmd_args, description, expect_success)
+        out("\n".join(lines))
+        if ok:
             passed += 1
         else:
             failed += 1
-    
+
+    out(f"   {suite_name}: {passed} passed, {failed} failed")
+    out.flush()
     return passed, failed
 
+def test_global_flags():
+    """Test global flags"""
+    return run_suite("Global Flags", ALL_TESTS["Global Flags"])
+
+def test_process_command():
+    """Test process command with all options"""
+    return run_suite("Process Command", ALL_TESTS["Process Command"])
+
 def test_web_command():
     """Test web command with all options"""
-    print("\n🌐 Testing Web Command")
-    print("=" * 50)
-    
-    tests = [
-        # Basic web interface
-        (['web', '--no-interactive'], "Basic web interface", True),
-        
-        # Web with custom port and host
-        (['web', '--no-interactive', '--port', '8080', '--host', '127.0.0.1'], 
-         "Web with custom port and host", True),
-        
-        # Web with debug mode
-        (['web', '--no-interactive', '--debug'], "Web with debug mode", True),
-        
-        # Web with all options
-        (['web', '--no-interactive', '--port', '9000', '--host', '0.0.0.0', '--debug'], 
-         "Web with all options", True),
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for cmd_args, description, expect_success in tests:
-        if run_cli_command(cmd_args, description, expect_success):
-            passed += 1
-        else:
-            failed += 1
-    
-    return passed, failed
+    return run_suite("Web Command", ALL_TESTS["Web Command"])
 
 def test_config_command():
     """Test config command with all options"""
-    print("\n⚙️  Testing Config Command")
-    print("=" * 50)
-    
-    tests = [
-        # Show configuration
-        (['config', '--no-interactive', '--show'], "Show configuration", True),
-        
-        # Setup configuration
-        (['config', '--no-interactive', '--setup'], "Setup configuration", True),
-        
-        # Validate configuration
-        (['config', '--no-interactive', '--validate'], "Validate configuration", True),
-        
-        # Reset configuration
-        (['config', '--no-interactive', '--reset'], "Reset configuration", True),
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for cmd_args, description, expect_success in tests:
-        if run_cli_command(cmd_args, description, expect_success):
-            passed += 1
-        else:
-            failed += 1
-    
-    return passed, failed
+    return run_suite("Config Command", ALL_TESTS["Config Command"])
 
 def test_llm_config_command():
     """Test LLM config command with all options"""
-    print("\n🤖 Testing LLM Config Command")
-    print("=" * 50)
-    
-    tests = [
-        # List available models
-        (['llm-config', '--no-interactive', '--list'], "List available models", True),
-        
-        # List configured models
-        (['llm-config', '--no-interactive', '--list-configured'], "List configured models", True),
-        
-        # Test connections
-        (['llm-config', '--no-interactive', '--test-ollama'], "Test Ollama connection", True),
-        (['llm-config', '--no-interactive', '--test-openai'], "Test OpenAI connection", True),
-        (['llm-config', '--no-interactive', '--test-all'], "Test all connections", True),
-        
-        # Add models (these will fail without API keys, but should not hang)
-        (['llm-config', '--no-interactive', '--add-ollama', 'llama2'], "Add Ollama model", True),
-        (['llm-config', '--no-interactive', '--add-openai', 'gpt-4', '--openai-key', 'test_key'], 
-         "Add OpenAI model with key", True),
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for cmd_args, description, expect_success in tests:
-        if run_cli_command(cmd_args, description, expect_success):
-            passed += 1
-        else:
-            failed += 1
-    
-    return passed, failed
+    return run_suite("LLM Config Command", ALL_TESTS["LLM Config Command"])
 
 def test_view_command():
     """Test view command with all options"""
-    print("\n📋 Testing View Command")
-    print("=" * 50)
-    
-    tests = [
-        # List results
-        (['view', '--no-interactive', '--list'], "List results", True),
-        
-        # Generate summary
-        (['view', '--no-interactive', '--summary'], "Generate summary", True),
-        
-        # Export to CSV
-        (['view', '--no-interactive', '--export', 'csv', '--output', 'test_export.csv'], 
-         "Export to CSV", True),
-        
-        # Export to JSON
-        (['view', '--no-interactive', '--export', 'json', '--output', 'test_export.json'], 
-         "Export to JSON", True),
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for cmd_args, description, expect_success in tests:
-        if run_cli_command(cmd_args, description, expect_success):
-            passed += 1
-        else:
-            failed += 1
-    
-    return passed, failed
+    return run_suite("View Command", ALL_TESTS["View Command"])
 
 def test_database_command():
     """Test database command with all options"""
-    print("\n🗄️  Testing Database Command")
-    print("=" * 50)
-    
-    tests = [
-        # Show database stats
-        (['database', '--no-interactive', '--stats'], "Show database stats", True),
-        
-        # Backup database
-        (['database', '--no-interactive', '--backup', 'test_backup.db'], "Backup database", True),
-        
-        # Clear database (should fail without confirmation in non-interactive mode)
-        (['database', '--no-interactive', '--clear'], "Clear database", False),
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for cmd_args, description, expect_success in tests:
-        if run_cli_command(cmd_args, description, expect_success):
-            passed += 1
-        else:
-            failed += 1
-    
-    return passed, failed
+    return run_suite("Database Command", ALL_TESTS["Database Command"])
 
 def test_wildcard_command():
     """Test wildcard command with all options"""
-    print("\n🎯 Testing Wildcard Command")
-    print("=" * 50)
-    
-    tests = [
-        # Generate all wildcards
-        (['wildcard', '--no-interactive', '--all'], "Generate all wildcards", True),
-        
-        # Generate individual groups
-        (['wildcard', '--no-interactive', '--groups'], "Generate individual groups", True),
-        
-        # Generate combined wildcard
-        (['wildcard', '--no-interactive', '--combined'], "Generate combined wildcard", True),
-        
-        # Generate combinations
-        (['wildcard', '--no-interactive', '--combinations'], "Generate combinations", True),
-        
-        # Generate with custom output directory
-        (['wildcard', '--no-interactive', '--output', 'test_wildcards', '--all'], 
-         "Generate with custom output", True),
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for cmd_args, description, expect_success in tests:
-        if run_cli_command(cmd_args, description, expect_success):
-            passed += 1
-        else:
-            failed += 1
-    
-    return passed, failed
-
-def test_global_flags():
-    """Test global flags"""
-    print("\n🌍 Testing Global Flags")
-    print("=" * 50)
-    
-    tests = [
-        # Test --help
-        (['--help'], "Global help", True),
-        
-        # Test --verbose
-        (['process', '--no-interactive', '--verbose'], "Process with verbose output", True),
-        
-        # Test --quiet
-        (['process', '--no-interactive', '--quiet'], "Process with quiet output", True),
-        
-        # Test --yes
-        (['config', '--no-interactive', '--yes', '--show'], "Config with yes flag", True),
-        
-        # Test no command with --no-interactive (should fail)
-        (['--no-interactive'], "No command with no-interactive", False),
-    ]
-    
-    passed = 0
-    failed = 0
-    
-    for cmd_args, description, expect_success in tests:
-        if run_cli_command(cmd_args, description, expect_success):
-            passed += 1
-        else:
-            failed += 1
-    
-    return passed, failed
+    return run_suite("Wildcard Command", ALL_TESTS["Wildcard Command"])
 
 def main():
     """Run all CLI tests"""
-    print("🧪 CLI Non-Interactive Mode Tests")
-    print("=" * 60)
-    print("Testing that CLI can run completely non-interactively")
-    print("with all options provided via command-line arguments.")
-    print()
-    
-    # Create test directories
-    os.makedirs('Images', exist_ok=True)
-    os.makedirs('Output', exist_ok=True)
-    
-    # Run all test suites
-    test_suites = [
-        ("Global Flags", test_global_flags),
-        ("Process Command", test_process_command),
-        ("Web Command", test_web_command),
-        ("Config Command", test_config_command),
-        ("LLM Config Command", test_llm_config_command),
-        ("View Command", test_view_command),
-        ("Database Command", test_database_command),
-        ("Wildcard Command", test_wildcard_command),
-    ]
-    
-    total_passed = 0
-    total_failed = 0
-    
-    for suite_name, test_func in test_suites:
-        print(f"\n📊 Running {suite_name} Tests")
-        print("-" * 40)
-        
-        passed, failed = test_func()
-        total_passed += passed
-        total_failed += failed
-        
-        print(f"   {suite_name}: {passed} passed, {failed} failed")
-    
+    out("🧪 CLI Non-Interactive Mode Tests")
+    out("=" * 60)
+    out("Testing that CLI can run completely non-interactively")
+    out("with all options provided via command-line arguments.")
+    out()
+    out.flush()
+
+    # Run every test from every suite in definition order; read-only commands
+    # between two stateful ones (writes, port binds) run concurrently
+    tests = {
+        (suite_name, index): (description, cmd_args, expect_success)
+        for suite_name, suite_tests in ALL_TESTS.items()
+        for index, (description, cmd_args, expect_success) in enumerate(suite_tests)
+    }
+    results = run_commands_ordered(
+        [(key, [sys.executable, 'main.py'] + cmd_args, 30) for key, (_, cmd_args, _) in tests.items()],
+        stateful=lambda key: is_stateful(tests[key][1]),
+        progress=show_progress
+    )
+
+    passed = Counter()
+    failed = Counter()
+    outputs = {suite_name: [] for suite_name in ALL_TESTS}
+
+    for (suite_name, index), (description, cmd_args, expect_success) in tests.items():
+        returncode, stderr = results[(suite_name, index)]
+        ok, lines = check_result(cmd_args, description, expect_success, returncode, stderr)
+        if ok:
+            passed[suite_name] += 1
+        else:
+            failed[suite_name] += 1
+        outputs[suite_name].append((index, lines))
+
+    # Print results grouped by suite, in definition order
+    for suite_name in ALL_TESTS:
+        out(f"\n📊 Running {suite_name} Tests")
+        out("-" * 40)
+        for _, lines in sorted(outputs[suite_name]):
+            out("\n".join(lines))
+        out(f"   {suite_name}: {passed[suite_name]} passed, {failed[suite_name]} failed")
+
+    total_passed = sum(passed.values())
+    total_failed = sum(failed.values())
+
     # Summary
-    print("\n" + "=" * 60)
-    print("📊 Final Test Results")
-    print("=" * 60)
-    print(f"✅ Total Passed: {total_passed}")
-    print(f"❌ Total Failed: {total_failed}")
-    print(f"🎯 Total Tests: {total_passed + total_failed}")
-    
+    out("\n" + "=" * 60)
+    out("📊 Final Test Results")
+    out("=" * 60)
+    out(f"✅ Total Passed: {total_passed}")
+    out(f"❌ Total Failed: {total_failed}")
+    out(f"🎯 Total Tests: {total_passed + total_failed}")
+
     if total_failed == 0:
-        print("\n🎉 All CLI tests passed!")
-        print("\nThe CLI is working correctly in non-interactive mode:")
-        print("• ✅ All commands support --no-interactive flag")
-        print("• ✅ All options can be set via command-line arguments")
-        print("• ✅ No user input required when all options are provided")
-        print("• ✅ Proper error handling for missing required arguments")
+        out("\n🎉 All CLI tests passed!")
+        out("\nThe CLI is working correctly in non-interactive mode:")
+        out("• ✅ All commands support --no-interactive flag")
+        out("• ✅ All options can be set via command-line arguments")
+        out("• ✅ No user input required when all options are provided")
+        out("• ✅ Proper error handling for missing required arguments")
+        out.flush()
         return 0
     else:
-        print(f"\n⚠️  {total_failed} test(s) failed. Check the output above for details.")
+        out(f"\n⚠️  {total_failed} test(s) failed. Check the output above for details.")
+        out.flush()
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main())
@@ -14,264 +14,324 @@ import os
 import json
 import tempfile
 import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import pytest
+
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from src.config.config_manager import (
-    create_default_env_file, create_default_config_file,
-    load_config_file, get_combined_config,
-    update_public_config, update_private_config
-)
-from src.services.config_service import ConfigService
+from cli_runner import OutputBuffer
+
+# Report lines are buffered and written once per test / run
+out = OutputBuffer()
+
+# The config modules are imported inside the functions that use them, so
+# selecting a single test (-k) only loads what that test needs
+
+
+def _create_default_files(directory):
+    """Write the default .env and config.json into directory"""
+    from src.config.config_manager import create_default_env_file, create_default_config_file
+    
+    os.makedirs(directory, exist_ok=True)
+    create_default_env_file(str(directory))
+    create_default_config_file(str(directory))
+    return directory
+
+
+def _mkdir(directory):
+    """Create and return an empty directory"""
+    directory.mkdir()
+    return directory
+
+
+def _copy_config_dir(template_dir, destination):
+    """Copy a prebuilt config directory instead of regenerating the defaults"""
+    shutil.copytree(template_dir, destination)
+    return destination
+
+
+def _walk(node):
+    """Yield every key and scalar value in a nested config structure"""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield key
+            yield from _walk(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+    else:
+        yield node
 
 
-def test_config_file_creation():
+@pytest.fixture(autouse=True)
+def _flush_output():
+    """Write each test's buffered report lines once it finishes"""
+    yield
+    out.flush()
+
+
+@pytest.fixture(scope="session")
+def config_template_dir(tmp_path_factory):
+    """Default config files, created once per session. Treat as read-only."""
+    return _create_default_files(tmp_path_factory.mktemp("config_template"))
+
+
+@pytest.fixture
+def config_dir(config_template_dir, tmp_path):
+    """Writable copy of the default config files for tests that update them"""
+    return _copy_config_dir(config_template_dir, tmp_path / "cfg")
+
+
+def test_config_file_creation(tmp_path):
     """Test creating configuration files"""
-    print("🧪 Testing configuration file creation...")
+    from src.config.config_manager import create_default_env_file, create_default_config_file
     
-    # Create temporary directory
-    temp_dir = tempfile.mkdtemp()
-    try:
-        # Test creating .env file
-        success = create_default_env_file(temp_dir)
-        assert success, "Failed to create .env file"
-        
-        # Check .env file exists and has content
-        env_file = os.path.join(temp_dir, '.env')
-        assert os.path.exists(env_file), ".env file not created"
-        
-        with open(env_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            assert 'OPENAI_API_KEY' in content, "OpenAI API key not in .env"
-            assert 'your_openai_api_key_here' in content, "Placeholder not in .env"
-        
-        # Test creating config.json file
-        success = create_default_config_file(temp_dir)
-        assert success, "Failed to create config.json file"
-        
-        # Check config.json file exists and has content
-        config_file = os.path.join(temp_dir, 'config.json')
-        assert os.path.exists(config_file), "config.json file not created"
-        
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-            assert 'clip_config' in config, "clip_config not in config.json"
-            assert 'analysis_features' in config, "analysis_features not in config.json"
-            assert config['clip_config']['model_name'] == 'ViT-L-14/openai'
-        
-        print("✅ Configuration file creation test passed!")
-        
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    out("🧪 Testing configuration file creation...")
+    
+    temp_dir = str(tmp_path)
+    
+    # Test creating .env file
+    success = create_default_env_file(temp_dir)
+    assert success, "Failed to create .env file"
+    
+    # Check .env file exists and has content
+    env_file = os.path.join(temp_dir, '.env')
+    assert os.path.exists(env_file), ".env file not created"
+    
+    # The keys are ASCII, so search the raw bytes instead of decoding
+    content = Path(env_file).read_bytes()
+    assert b'OPENAI_API_KEY' in content, "OpenAI API key not in .env"
+    assert b'your_openai_api_key_here' in content, "Placeholder not in .env"
+    
+    # Test creating config.json file
+    success = create_default_config_file(temp_dir)
+    assert success, "Failed to create config.json file"
+    
+    # Check config.json file exists and has content
+    config_file = os.path.join(temp_dir, 'config.json')
+    assert os.path.exists(config_file), "config.json file not created"
+    
+    with open(config_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+        assert 'clip_config' in config, "clip_config not in config.json"
+        assert 'analysis_features' in config, "analysis_features not in config.json"
+        assert config['clip_config']['model_name'] == 'ViT-L-14/openai'
+    
+    out("✅ Configuration file creation test passed!")
 
 
-def test_config_loading():
+def test_config_loading(config_template_dir):
     """Test loading configuration files"""
-    print("🧪 Testing configuration loading...")
+    from src.config.config_manager import load_config_file, get_combined_config
     
-    # Create temporary directory with config files
-    temp_dir = tempfile.mkdtemp()
-    try:
-        # Create config files
-        create_default_env_file(temp_dir)
-        create_default_config_file(temp_dir)
-        
-        # Test loading config.json
-        config = load_config_file(temp_dir)
-        assert 'clip_config' in config, "clip_config not loaded"
-        assert 'analysis_features' in config, "analysis_features not loaded"
-        assert config['clip_config']['model_name'] == 'ViT-L-14/openai'
-        
-        # Test combined configuration
-        combined = get_combined_config(temp_dir)
-        assert 'public' in combined, "public config not in combined"
-        assert 'private' in combined, "private config not in combined"
-        assert combined['public']['clip_config']['model_name'] == 'ViT-L-14/openai'
-        assert combined['private']['web_port'] == 5050
-        
-        print("✅ Configuration loading test passed!")
-        
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    out("🧪 Testing configuration loading...")
+    
+    # Default config files are shared and must not be modified here
+    temp_dir = str(config_template_dir)
+    
+    # Test loading config.json
+    config = load_config_file(temp_dir)
+    assert 'clip_config' in config, "clip_config not loaded"
+    assert 'analysis_features' in config, "analysis_features not loaded"
+    assert config['clip_config']['model_name'] == 'ViT-L-14/openai'
+    
+    # Test combined configuration
+    combined = get_combined_config(temp_dir)
+    assert 'public' in combined, "public config not in combined"
+    assert 'private' in combined, "private config not in combined"
+    assert combined['public']['clip_config']['model_name'] == 'ViT-L-14/openai'
+    assert combined['private']['web_port'] == 5050
+    
+    out("✅ Configuration loading test passed!")
 
 
-def test_config_updates():
+def test_config_updates(config_dir):
     """Test updating configuration"""
-    print("🧪 Testing configuration updates...")
+    from src.config.config_manager import load_config_file, get_combined_config, update_config_bulk
     
-    # Create temporary directory with config files
-    temp_dir = tempfile.mkdtemp()
-    try:
-        # Create config files
-        create_default_env_file(temp_dir)
-        create_default_config_file(temp_dir)
-        
-        # Test updating public config
-        public_updates = {
-            'clip_config': {
-                'model_name': 'ViT-B-32/openai',
-                'enable_clip_analysis': False
-            },
-            'analysis_features': {
-                'enable_llm_analysis': False,
-                'timeout': 60
-            }
-        }
-        
-        success = update_public_config(public_updates, temp_dir)
-        assert success, "Failed to update public config"
-        
-        # Verify updates
-        config = load_config_file(temp_dir)
-        assert config['clip_config']['model_name'] == 'ViT-B-32/openai'
-        assert config['clip_config']['enable_clip_analysis'] == False
-        assert config['analysis_features']['enable_llm_analysis'] == False
-        assert config['analysis_features']['timeout'] == 60
-        
-        # Test updating private config
-        private_updates = {
-            'OPENAI_API_KEY': 'test_openai_key_123',
-            'WEB_PORT': '8080'
+    out("🧪 Testing configuration updates...")
+    
+    temp_dir = str(config_dir)
+    
+    # Public (config.json) and private (.env) updates, written once each
+    public_updates = {
+        'clip_config': {
+            'model_name': 'ViT-B-32/openai',
+            'enable_clip_analysis': False
+        },
+        'analysis_features': {
+            'enable_llm_analysis': False,
+            'timeout': 60
         }
-        
-        success = update_private_config(private_updates, temp_dir)
-        assert success, "Failed to update private config"
-        
-        # Verify updates
-        combined = get_combined_config(temp_dir)
-        assert combined['private']['openai_api_key'] == 'test_openai_key_123'
-        assert combined['private']['web_port'] == 8080
-        
-        print("✅ Configuration updates test passed!")
-        
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    }
+    private_updates = {
+        'OPENAI_API_KEY': 'test_openai_key_123',
+        'WEB_PORT': '8080'
+    }
+    
+    success = update_config_bulk(public=public_updates, private=private_updates, project_root=temp_dir)
+    assert success, "Failed to update config"
+    
+    # Verify public updates
+    config = load_config_file(temp_dir)
+    assert config['clip_config']['model_name'] == 'ViT-B-32/openai'
+    assert config['clip_config']['enable_clip_analysis'] == False
+    assert config['analysis_features']['enable_llm_analysis'] == False
+    assert config['analysis_features']['timeout'] == 60
+    
+    # Verify private updates
+    combined = get_combined_config(temp_dir)
+    assert combined['private']['openai_api_key'] == 'test_openai_key_123'
+    assert combined['private']['web_port'] == 8080
+    
+    out("✅ Configuration updates test passed!")
 
 
-def test_config_service():
+def test_config_service(config_dir):
     """Test ConfigService with new configuration system"""
-    print("🧪 Testing ConfigService...")
+    from src.services.config_service import ConfigService
     
-    # Create temporary directory with config files
-    temp_dir = tempfile.mkdtemp()
-    try:
-        # Create config files
-        create_default_env_file(temp_dir)
-        create_default_config_file(temp_dir)
-        
-        # Test ConfigService
-        config_service = ConfigService(temp_dir)
-        
-        # Test get_config
-        config = config_service.get_config()
-        assert 'API_BASE_URL' in config, "API_BASE_URL not in config"
-        assert 'CLIP_MODEL_NAME' in config, "CLIP_MODEL_NAME not in config"
-        assert 'ENABLE_CLIP_ANALYSIS' in config, "ENABLE_CLIP_ANALYSIS not in config"
-        assert config['API_BASE_URL'] == 'http://localhost:7860'
-        assert config['CLIP_MODEL_NAME'] == 'ViT-L-14/openai'
-        assert config['ENABLE_CLIP_ANALYSIS'] == True
-        
-        # Test update_config
-        updates = {
-            'API_BASE_URL': 'http://test:7860',
-            'CLIP_MODEL_NAME': 'ViT-B-32/openai',
-            'ENABLE_CLIP_ANALYSIS': False,
-            'OPENAI_API_KEY': 'test_key_456'
-        }
-        
-        success = config_service.update_config(updates)
-        assert success, "Failed to update config via ConfigService"
-        
-        # Verify updates
-        config = config_service.get_config()
-        assert config['API_BASE_URL'] == 'http://test:7860'
-        assert config['CLIP_MODEL_NAME'] == 'ViT-B-32/openai'
-        assert config['ENABLE_CLIP_ANALYSIS'] == False
-        
-        print("✅ ConfigService test passed!")
-        
-    finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+    out("🧪 Testing ConfigService...")
+    
+    temp_dir = str(config_dir)
+    
+    # Test ConfigService
+    config_service = ConfigService(temp_dir)
+    
+    # Test get_config
+    config = config_service.get_config()
+    assert 'API_BASE_URL' in config, "API_BASE_URL not in config"
+    assert 'CLIP_MODEL_NAME' in config, "CLIP_MODEL_NAME not in config"
+    assert 'ENABLE_CLIP_ANALYSIS' in config, "ENABLE_CLIP_ANALYSIS not in config"
+    assert config['API_BASE_URL'] == 'http://localhost:7860'
+    assert config['CLIP_MODEL_NAME'] == 'ViT-L-14/openai'
+    assert config['ENABLE_CLIP_ANALYSIS'] == True
+    
+    # Test update_config
+    updates = {
+        'API_BASE_URL': 'http://test:7860',
+        'CLIP_MODEL_NAME': 'ViT-B-32/openai',
+        'ENABLE_CLIP_ANALYSIS': False,
+        'OPENAI_API_KEY': 'test_key_456'
+    }
+    
+    success = config_service.update_config(updates)
+    assert success, "Failed to update config via ConfigService"
+    
+    # Verify updates
+    config = config_service.get_config()
+    assert config['API_BASE_URL'] == 'http://test:7860'
+    assert config['CLIP_MODEL_NAME'] == 'ViT-B-32/openai'
+    assert config['ENABLE_CLIP_ANALYSIS'] == False
+    
+    out("✅ ConfigService test passed!")
 
 
-def test_security_separation():
+def test_security_separation(config_template_dir):
     """Test that private and public settings are properly separated"""
-    print("🧪 Testing security separation...")
+    from src.config.config_manager import load_config_file
+    
+    out("🧪 Testing security separation...")
+    
+    temp_dir = str(config_template_dir)
+    
+    # Check that API keys are in .env (private)
+    env_file = os.path.join(temp_dir, '.env')
+    env_content = Path(env_file).read_bytes()
+    assert b'OPENAI_API_KEY' in env_content, "API key should be in .env"
+    assert b'your_openai_api_key_here' in env_content, "API key placeholder should be in .env"
+    
+    # Check that API keys are NOT in config.json (public)
+    config = load_config_file(temp_dir)
+    config_entries = set(_walk(config))
+    assert 'OPENAI_API_KEY' not in config_entries, "API key should NOT be in config.json"
+    assert 'your_openai_api_key_here' not in config_entries, "API key placeholder should NOT be in config.json"
     
-    # Create temporary directory with config files
-    temp_dir = tempfile.mkdtemp()
+    # Check that application settings are in config.json (public)
+    assert 'clip_config' in config, "clip_config should be in config.json"
+    assert 'analysis_features' in config, "analysis_features should be in config.json"
+    
+    out("✅ Security separation test passed!")
+
+
+def _run_test(test_name, directory):
+    """Run one test by name in a worker process, returning its error or None"""
     try:
-        # Create config files
-        create_default_env_file(temp_dir)
-        create_default_config_file(temp_dir)
-        
-        # Check that API keys are in .env (private)
-        env_file = os.path.join(temp_dir, '.env')
-        with open(env_file, 'r', encoding='utf-8') as f:
-            env_content = f.read()
-            assert 'OPENAI_API_KEY' in env_content, "API key should be in .env"
-            assert 'your_openai_api_key_here' in env_content, "API key placeholder should be in .env"
-        
-        # Check that API keys are NOT in config.json (public)
-        config_file = os.path.join(temp_dir, 'config.json')
-        with open(config_file, 'r', encoding='utf-8') as f:
-            config_content = f.read()
-            assert 'OPENAI_API_KEY' not in config_content, "API key should NOT be in config.json"
-            assert 'your_openai_api_key_here' not in config_content, "API key placeholder should NOT be in config.json"
-        
-        # Check that application settings are in config.json (public)
-        assert 'clip_config' in config_content, "clip_config should be in config.json"
-        assert 'analysis_features' in config_content, "analysis_features should be in config.json"
-        
-        print("✅ Security separation test passed!")
-        
+        globals()[test_name](directory)
+        return None
+    except Exception as e:
+        return str(e)
     finally:
-        shutil.rmtree(temp_dir, ignore_errors=True)
+        out.flush()
 
 
 def main():
     """Run all configuration tests"""
-    print("🔧 Testing New Configuration System")
-    print("=" * 50)
+    out("🔧 Testing New Configuration System")
+    out("=" * 50)
+    out.flush()
     
-    tests = [
-        test_config_file_creation,
-        test_config_loading,
-        test_config_updates,
-        test_config_service,
-        test_security_separation
-    ]
+    # Each test with the name of the pytest fixture it takes
+    tests = {
+        test_config_file_creation: 'tmp_path',
+        test_config_loading: 'config_template_dir',
+        test_config_updates: 'config_dir',
+        test_config_service: 'config_dir',
+        test_security_separation: 'config_template_dir',
+    }
     
     passed = 0
     failed = 0
     
-    for test in tests:
-        try:
-            test()
-            passed += 1
-        except Exception as e:
-            print(f"❌ {test.__name__} failed: {e}")
-            failed += 1
-    
-    print("\n" + "=" * 50)
-    print("📊 Test Results")
-    print("=" * 50)
-    print(f"✅ Passed: {passed}")
-    print(f"❌ Failed: {failed}")
-    print(f"🎯 Total: {passed + failed}")
+    # ignore_cleanup_errors only exists on Python 3.10+
+    cleanup_kwargs = {'ignore_cleanup_errors': True} if sys.version_info >= (3, 10) else {}
+    with tempfile.TemporaryDirectory(**cleanup_kwargs) as tmp:
+        # Mirror the pytest fixtures: build the defaults once, copy them for
+        # tests that write, and hand the shared template to read-only tests
+        work_dir = Path(tmp)
+        template_dir = _create_default_files(work_dir / "template")
+        fixtures = {
+            'tmp_path': lambda name: _mkdir(work_dir / name),
+            'config_template_dir': lambda name: template_dir,
+            'config_dir': lambda name: _copy_config_dir(template_dir, work_dir / name),
+        }
+        
+        # Each test gets its own directory, so they can run in separate processes
+        with ProcessPoolExecutor(max_workers=min(len(tests), os.cpu_count() or 1)) as executor:
+            futures = {
+                executor.submit(_run_test, test.__name__, fixtures[fixture](test.__name__)): test
+                for test, fixture in tests.items()
+            }
+            for future in as_completed(futures):
+                error = future.result()
+                if error is None:
+                    passed += 1
+                else:
+                    out(f"❌ {futures[future].__name__} failed: {error}")
+                    failed += 1
+    
+    out("\n" + "=" * 50)
+    out("📊 Test Results")
+    out("=" * 50)
+    out(f"✅ Passed: {passed}")
+    out(f"❌ Failed: {failed}")
+    out(f"🎯 Total: {passed + failed}")
     
     if failed == 0:
-        print("\n🎉 All configuration tests passed!")
-        print("\nThe new two-file configuration system is working correctly:")
-        print("• ✅ Private settings (.env) - API keys, URLs, secrets")
-        print("• ✅ Public settings (config.json) - Application features, UI preferences")
-        print("• ✅ Proper separation of sensitive and non-sensitive data")
-        print("• ✅ Backward compatibility with existing code")
+        out("\n🎉 All configuration tests passed!")
+        out("\nThe new two-file configuration system is working correctly:")
+        out("• ✅ Private settings (.env) - API keys, URLs, secrets")
+        out("• ✅ Public settings (config.json) - Application features, UI preferences")
+        out("• ✅ Proper separation of sensitive and non-sensitive data")
+        out("• ✅ Backward compatibility with existing code")
+        out.flush()
         return 0
     else:
-        print(f"\n⚠️  {failed} test(s) failed. Check the output above for details.")
+        out(f"\n⚠️  {failed} test(s) failed. Check the output above for details.")
+        out.flush()
         return 1
 
 
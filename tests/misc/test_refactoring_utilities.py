@@ -11,15 +11,39 @@ import sys
 import time
 import tempfile
 import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
+import pytest
+
 # Add project root to path
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
 
+from cli_runner import OutputBuffer
+
+# Report lines are buffered and written once per test / run
+out = OutputBuffer()
+
+@pytest.fixture(autouse=True)
+def _flush_output():
+    """Write each test's buffered report lines once it finishes"""
+    yield
+    out.flush()
+
+def _wait_for_clock_tick():
+    """Spin until time.time() advances so measured durations are non-zero
+
+    Costs a microsecond or so on Linux, at most one clock tick elsewhere,
+    instead of sleeping for a fixed 100ms.
+    """
+    start = time.time()
+    while time.time() == start:
+        pass
+
 def test_logging_system():
     """Test the centralized logging system"""
-    print("🧪 Testing Logging System...")
+    out("🧪 Testing Logging System...")
     
     try:
         from src.utils.logger import get_logger, setup_global_logging
@@ -36,24 +60,24 @@ def test_logging_system():
         
         # Test performance tracking
         logger.start_timer("test_operation")
-        time.sleep(0.1)  # Simulate work
+        _wait_for_clock_tick()
         duration = logger.end_timer("test_operation")
         assert duration > 0, "Timer should return positive duration"
         
         # Test context manager
         with logger.timed_operation("context_test"):
-            time.sleep(0.05)  # Simulate work
+            pass
         
-        print("✅ Logging system tests passed!")
+        out("✅ Logging system tests passed!")
         return True
         
     except Exception as e:
-        print(f"❌ Logging system tests failed: {e}")
+        out(f"❌ Logging system tests failed: {e}")
         return False
 
 def test_error_handling():
     """Test the error handling system"""
-    print("🧪 Testing Error Handling System...")
+    out("🧪 Testing Error Handling System...")
     
     try:
         from src.utils.error_handler import (
@@ -82,16 +106,16 @@ def test_error_handling():
         result = failing_function()
         assert result == "fallback", "Graceful degradation should return fallback value"
         
-        print("✅ Error handling system tests passed!")
+        out("✅ Error handling system tests passed!")
         return True
         
     except Exception as e:
-        print(f"❌ Error handling system tests failed: {e}")
+        out(f"❌ Error handling system tests failed: {e}")
         return False
 
 def test_debug_utilities():
     """Test the debugging utilities"""
-    print("🧪 Testing Debug Utilities...")
+    out("🧪 Testing Debug Utilities...")
     
     try:
         from src.utils.debug_utils import (
@@ -108,7 +132,7 @@ def test_debug_utilities():
         # Test performance profiler
         profiler = PerformanceProfiler()
         with profiler.profile("test_profile"):
-            time.sleep(0.1)  # Simulate work
+            _wait_for_clock_tick()
         
         stats = profiler.get_profile_stats("test_profile")
         assert stats['count'] == 1, "Should have one profile entry"
@@ -129,16 +153,16 @@ def test_debug_utilities():
         assert 'system' in debug_info, "Should provide system information"
         assert 'process' in debug_info, "Should provide process information"
         
-        print("✅ Debug utilities tests passed!")
+        out("✅ Debug utilities tests passed!")
         return True
         
     except Exception as e:
-        print(f"❌ Debug utilities tests failed: {e}")
+        out(f"❌ Debug utilities tests failed: {e}")
         return False
 
 def test_integration():
     """Test integration of all utilities"""
-    print("🧪 Testing Integration...")
+    out("🧪 Testing Integration...")
     
     try:
         from src.utils.logger import get_logger
@@ -161,16 +185,16 @@ def test_integration():
             context.add_context("test_data", "sample")
             logger.info("Testing integration", data={'context': context.context_data})
         
-        print("✅ Integration tests passed!")
+        out("✅ Integration tests passed!")
         return True
         
     except Exception as e:
-        print(f"❌ Integration tests failed: {e}")
+        out(f"❌ Integration tests failed: {e}")
         return False
 
 def test_configuration():
     """Test configuration and environment setup"""
-    print("🧪 Testing Configuration...")
+    out("🧪 Testing Configuration...")
     
     try:
         # Test environment variables
@@ -187,16 +211,16 @@ def test_configuration():
         disable_debug_mode()
         assert os.getenv('DEBUG') == 'False', "Debug mode should be disabled"
         
-        print("✅ Configuration tests passed!")
+        out("✅ Configuration tests passed!")
         return True
         
     except Exception as e:
-        print(f"❌ Configuration tests failed: {e}")
+        out(f"❌ Configuration tests failed: {e}")
         return False
 
 def test_file_operations():
     """Test file operations with new utilities"""
-    print("🧪 Testing File Operations...")
+    out("🧪 Testing File Operations...")
     
     try:
         from src.utils.logger import get_logger
@@ -233,17 +257,25 @@ def test_file_operations():
             except Exception:
                 pass  # Expected error
         
-        print("✅ File operations tests passed!")
+        out("✅ File operations tests passed!")
         return True
         
     except Exception as e:
-        print(f"❌ File operations tests failed: {e}")
+        out(f"❌ File operations tests failed: {e}")
         return False
 
+def _run_test(test_name):
+    """Run one test by name in a worker process"""
+    try:
+        return globals()[test_name]()
+    finally:
+        out.flush()
+
 def main():
     """Run all tests"""
-    print("🚀 Testing Refactoring Utilities")
-    print("=" * 50)
+    out("🚀 Testing Refactoring Utilities")
+    out("=" * 50)
+    out.flush()
     
     tests = [
         test_logging_system,
@@ -257,35 +289,39 @@ def main():
     passed = 0
     failed = 0
     
-    for test in tests:
-        try:
-            if test():
-                passed += 1
-            else:
+    # The tests are independent, so run them in separate processes
+    with ProcessPoolExecutor(max_workers=min(len(tests), os.cpu_count() or 1)) as executor:
+        futures = {executor.submit(_run_test, test.__name__): test for test in tests}
+        for future in as_completed(futures):
+            try:
+                if future.result():
+                    passed += 1
+                else:
+                    failed += 1
+            except Exception as e:
+                out(f"❌ Test {futures[future].__name__} failed with exception: {e}")
                 failed += 1
-        except Exception as e:
-            print(f"❌ Test {test.__name__} failed with exception: {e}")
-            failed += 1
     
-    print("\n" + "=" * 50)
-    print("📊 Test Results")
-    print("=" * 50)
-    print(f"✅ Passed: {passed}")
-    print(f"❌ Failed: {failed}")
-    print(f"🎯 Total: {passed + failed}")
+    out("\n" + "=" * 50)
+    out("📊 Test Results")
+    out("=" * 50)
+    out(f"✅ Passed: {passed}")
+    out(f"❌ Failed: {failed}")
+    out(f"🎯 Total: {passed + failed}")
     
     if failed == 0:
-        print("\n🎉 All refactoring utility tests passed!")
-        print("\nThe new utilities are working correctly:")
-        print("• ✅ Centralized logging system")
-        print("• ✅ Comprehensive error handling")
-        print("• ✅ Advanced debugging utilities")
-        print("• ✅ Performance monitoring")
-        print("• ✅ Memory tracking")
-        print("• ✅ Configuration management")
+        out("\n🎉 All refactoring utility tests passed!")
+        out("\nThe new utilities are working correctly:")
+        out("• ✅ Centralized logging system")
+        out("• ✅ Comprehensive error handling")
+        out("• ✅ Advanced debugging utilities")
+        out("• ✅ Performance monitoring")
+        out("• ✅ Memory tracking")
+        out("• ✅ Configuration management")
     else:
-        print(f"\n⚠️  {failed} test(s) failed. Check the output above for details.")
+        out(f"\n⚠️  {failed} test(s) failed. Check the output above for details.")
     
+    out.flush()
     return failed == 0
 
 if __name__ == "__main__":
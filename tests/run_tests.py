@@ -11,30 +11,91 @@ Usage:
     python tests/run_tests.py --integration   # Run integration tests only
     python tests/run_tests.py --web           # Run web interface tests only
     python tests/run_tests.py --misc          # Run misc tests
-    python tests/run_tests.py --fast          # Run fast tests (skip slow integration)
+    python tests/run_tests.py --fast          # Run fast tests (unit tests not marked slow)
     python tests/run_tests.py --verbose       # Verbose output
     python tests/run_tests.py --coverage      # Run with coverage report
+    python tests/run_tests.py --jobs 4        # Run on 4 workers (needs pytest-xdist)
+    python tests/run_tests.py --exitfirst     # Stop at the first failure
+    python tests/run_tests.py --changed       # Run only tests affected by local changes
+
+The old positional form is still accepted:
+    python tests/run_tests.py unit            # Same as --unit
+    python tests/run_tests.py integration     # Same as --integration
+    python tests/run_tests.py specific NAME   # Run test_NAME*.py, else tests matching NAME (pytest -k)
 """
 
 import argparse
 import sys
 import os
+import json
 import subprocess
+import runpy
+import tempfile
+import importlib.util
+import xml.etree.ElementTree as ET
+from functools import lru_cache
 from pathlib import Path
 
-# Add project root to path
-PROJECT_ROOT = Path(__file__).parent.parent
-sys.path.insert(0, str(PROJECT_ROOT))
+import pytest
+
+# Resolved once at import; pytest adds the project root to sys.path itself
+# (pythonpath in pytest.ini)
+TESTS_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = TESTS_DIR.parent
+UNIT_DIR = TESTS_DIR / "unit"
+INTEGRATION_DIR = TESTS_DIR / "integration"
+MISC_DIR = TESTS_DIR / "misc"
+
+# mtimes of misc scripts at their last passing run, for --changed
+MISC_RUNS_FILE = TESTS_DIR / ".misc_runs.json"
+
+# Report banners
+BANNER = "=" * 70
+SEPARATOR = "-" * 50
+
+
+@lru_cache(maxsize=None)
+def _find_test(test_name):
+    """Return the first tests/**/test_<name>*.py file, or None
+    
+    Walks with os.scandir so directory entries need no extra stat and the
+    search stops at the first match.
+    """
+    prefix = f"test_{test_name}"
+    stack = [str(TESTS_DIR)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.startswith(prefix) and entry.name.endswith(".py"):
+                    return Path(entry.path)
+    return None
 
 
 class TestRunner:
     """Unified test runner with flexible options"""
     
-    def __init__(self):
+    def __init__(self, jobs=None, max_processes=None, exitfirst=False, changed=False):
         self.project_root = PROJECT_ROOT
-        self.tests_dir = self.project_root / "tests"
+        self.tests_dir = TESTS_DIR
+        self.exitfirst = exitfirst
+        
+        # Change-based selection via pytest-testmon, when it is installed
+        self.changed = changed
+        self.has_testmon = importlib.util.find_spec("testmon") is not None
+        if changed and not self.has_testmon:
+            print("⚠️  pytest-testmon not installed, running all selected tests")
+        
+        # Parallel workers via pytest-xdist, when it is installed
+        self.has_xdist = importlib.util.find_spec("xdist") is not None
+        if jobs is None:
+            jobs = "auto" if self.has_xdist else 0
+        self.jobs = jobs
+        self.max_processes = max_processes
         
-    def run_pytest(self, test_paths, verbose=False, coverage=False, markers=None):
+    def run_pytest(self, test_paths, verbose=False, coverage=False, markers=None, keyword=None,
+                   junitxml=None):
         """Run pytest with specified options"""
         cmd = [sys.executable, "-m", "pytest"]
         
@@ -53,44 +114,74 @@ class TestRunner:
         if markers:
             cmd.extend(["-m", markers])
         
-        # Add other useful options
+        if keyword:
+            cmd.extend(["-k", keyword])
+        
+        if self.exitfirst:
+            cmd.append("-x")
+        
+        if self.changed and self.has_testmon:
+            # The first run has no .testmondata yet, so it runs (and records) everything
+            cmd.append("--testmon")
+        
+        if self.has_xdist and self.jobs not in (0, "0"):
+            # loadscope keeps each module's functions, or each TestCase class, on
+            # one worker, so module fixtures and setUpClass still run once while
+            # files with several classes spread across workers
+            cmd.extend(["-n", str(self.jobs), "--dist=loadscope"])
+            if self.max_processes:
+                cmd.extend(["--maxprocesses", str(self.max_processes)])
+        elif self.jobs not in (0, "0", "auto"):
+            print("⚠️  pytest-xdist not installed, running tests serially")
+        
+        if junitxml:
+            cmd.append(f"--junitxml={junitxml}")
+        
+        # Add other useful options; pytest picks colors from the terminal itself
         cmd.extend([
             "--tb=short",  # Shorter tracebacks
-            "--color=yes",  # Colored output
         ])
         
         print(f"🧪 Running: {' '.join(cmd)}")
-        print("=" * 70)
+        print(BANNER)
         
-        result = subprocess.run(cmd, cwd=self.project_root)
-        return result.returncode
+        # Coverage needs a fresh process to measure imports from the start
+        if coverage:
+            result = subprocess.run(cmd, cwd=self.project_root)
+            return result.returncode
+        
+        # Otherwise run in this process and skip another interpreter start
+        saved_cwd = os.getcwd()
+        os.chdir(self.project_root)
+        try:
+            return int(pytest.main(cmd[3:]))
+        finally:
+            os.chdir(saved_cwd)
     
     def run_unit_tests(self, verbose=False, coverage=False):
         """Run all unit tests"""
         print("🧪 Running Unit Tests")
-        test_path = self.tests_dir / "unit"
-        return self.run_pytest([test_path], verbose, coverage)
+        return self.run_pytest([UNIT_DIR], verbose, coverage)
     
     def run_integration_tests(self, verbose=False, coverage=False):
         """Run all integration tests"""
         print("🧪 Running Integration Tests")
-        test_path = self.tests_dir / "integration"
-        return self.run_pytest([test_path], verbose, coverage)
+        return self.run_pytest([INTEGRATION_DIR], verbose, coverage)
     
     def run_web_tests(self, verbose=False, coverage=False):
         """Run web interface tests"""
         print("🧪 Running Web Interface Tests")
         test_paths = [
-            self.tests_dir / "unit" / "test_web_interface_refactored.py",
-            self.tests_dir / "integration" / "test_web_ui_integration.py",
-            self.tests_dir / "integration" / "test_ui_interactions.py",
+            UNIT_DIR / "test_web_interface_refactored.py",
+            INTEGRATION_DIR / "test_web_ui_integration.py",
+            INTEGRATION_DIR / "test_ui_interactions.py",
         ]
         return self.run_pytest(test_paths, verbose, coverage)
     
     def run_misc_tests(self, verbose=False):
         """Run miscellaneous tests"""
         print("🧪 Running Miscellaneous Tests")
-        test_path = self.tests_dir / "misc"
+        test_path = MISC_DIR
         
         # These are mostly standalone test scripts, run them individually
         misc_files = [
@@ -99,64 +190,153 @@ class TestRunner:
             "test_all_refactoring.py",
         ]
         
+        try:
+            passed_runs = json.loads(MISC_RUNS_FILE.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            passed_runs = {}
+        
         results = []
         for test_file in misc_files:
             test_path_full = test_path / test_file
             if test_path_full.exists():
+                mtime = test_path_full.stat().st_mtime_ns
+                if self.changed and passed_runs.get(test_file) == mtime:
+                    print(f"\n⏭️  Skipping {test_file} (unchanged since it last passed)")
+                    continue
+                
                 print(f"\n📝 Running {test_file}...")
-                print("-" * 50)
-                result = subprocess.run(
-                    [sys.executable, str(test_path_full)],
-                    cwd=self.project_root
-                )
-                results.append(result.returncode)
+                print(SEPARATOR)
+                results.append(self.run_script(test_path_full))
+                if results[-1] == 0:
+                    passed_runs[test_file] = mtime
+                else:
+                    passed_runs.pop(test_file, None)
+                if self.exitfirst and results[-1] != 0:
+                    break
             else:
                 print(f"⚠️  Test file not found: {test_file}")
         
+        try:
+            MISC_RUNS_FILE.write_text(json.dumps(passed_runs, indent=2), encoding='utf-8')
+        except OSError:
+            pass
+        
         return 0 if all(r == 0 for r in results) else 1
     
+    def run_script(self, script_path):
+        """Run a standalone test script as __main__ in this process
+        
+        Saves an interpreter start per script. The script's directory and the
+        project root go on sys.path as if it were run directly from the root;
+        sys.argv, sys.path and the working directory are restored afterwards.
+        Returns the exit code.
+        """
+        saved_argv, saved_path, saved_cwd = sys.argv[:], sys.path[:], os.getcwd()
+        sys.argv = [str(script_path)]
+        sys.path[:0] = [str(script_path.parent), str(self.project_root)]
+        os.chdir(self.project_root)
+        try:
+            runpy.run_path(str(script_path), run_name="__main__")
+            return 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return e.code or 0
+            print(e.code)
+            return 1
+        except Exception as e:
+            print(f"❌ {script_path.name} raised {type(e).__name__}: {e}")
+            return 1
+        finally:
+            sys.argv, sys.path[:] = saved_argv, saved_path
+            os.chdir(saved_cwd)
+    
+    def run_specific_test(self, test_name, verbose=False, coverage=False):
+        """Run the test file named test_<name>*.py, or tests matching name"""
+        test_path = _find_test(test_name)
+        if test_path is not None:
+            print(f"🧪 Running {test_path.relative_to(self.tests_dir)}")
+            return self.run_pytest([test_path], verbose, coverage)
+        
+        print(f"🧪 Running Tests Matching: {test_name}")
+        test_paths = [UNIT_DIR, INTEGRATION_DIR]
+        return self.run_pytest(test_paths, verbose, coverage, keyword=test_name)
+    
     def run_fast_tests(self, verbose=False, coverage=False):
-        """Run fast tests (unit tests only, skip slow integration)"""
+        """Run fast tests (unit tests only, skipping tests marked slow)"""
         print("🧪 Running Fast Tests (Unit Tests Only)")
-        return self.run_unit_tests(verbose, coverage)
+        return self.run_pytest([UNIT_DIR], verbose, coverage, markers="not slow")
     
     def run_all_tests(self, verbose=False, coverage=False):
-        """Run all test suites"""
+        """Run all test suites in a single pytest session"""
         print("🧪 Running All Tests")
-        print("=" * 70)
+        print(BANNER)
         
-        results = []
-        
-        print("\n" + "=" * 70)
-        print("1️⃣  UNIT TESTS")
-        print("=" * 70)
-        results.append(self.run_unit_tests(verbose, coverage))
+        suites = [("Unit Tests", "unit"), ("Integration Tests", "integration")]
         
-        print("\n" + "=" * 70)
-        print("2️⃣  INTEGRATION TESTS")
-        print("=" * 70)
-        results.append(self.run_integration_tests(verbose, coverage))
+        print("\n" + BANNER)
+        print("1️⃣  UNIT + 2️⃣  INTEGRATION TESTS")
+        print(BANNER)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            junitxml = Path(tmp_dir) / "results.xml"
+            returncode = self.run_pytest([self.tests_dir / suite for _, suite in suites],
+                                         verbose, coverage, junitxml=junitxml)
+            report = self.suite_results(junitxml)
         
-        # Print summary
-        print("\n" + "=" * 70)
-        print("📊 TEST SUMMARY")
-        print("=" * 70)
-        
-        suite_names = ["Unit Tests", "Integration Tests"]
-        for i, (name, result) in enumerate(zip(suite_names, results)):
-            status = "✅ PASSED" if result == 0 else "❌ FAILED"
-            print(f"{name}: {status}")
+        # Without a report (e.g. pytest crashed) every suite takes the overall result
+        if report is None:
+            ran_suites = {suite for _, suite in suites}
+            failed_suites = ran_suites if returncode != 0 else set()
+        else:
+            ran_suites, failed_suites = report
         
-        all_passed = all(r == 0 for r in results)
-        print("\n" + "=" * 70)
+        # Print summary; a suite with no test cases in the report never ran
+        # (e.g. --exitfirst stopped before it), which is not a pass
+        statuses = []
+        for _, suite in suites:
+            if suite in failed_suites:
+                statuses.append("❌ FAILED")
+            elif suite not in ran_suites:
+                statuses.append("⏭️  NOT RUN")
+            else:
+                statuses.append("✅ PASSED")
+        all_passed = returncode == 0 and all(s == "✅ PASSED" for s in statuses)
+        lines = ["", BANNER, "📊 TEST SUMMARY", BANNER]
+        for (name, _), status in zip(suites, statuses):
+            lines.append(f"{name}: {status}")
         if all_passed:
-            print("🎉 ALL TESTS PASSED!")
+            verdict = "🎉 ALL TESTS PASSED!"
+        elif returncode == 0 and not failed_suites:
+            verdict = "⏭️  SOME TESTS DID NOT RUN"
         else:
-            print("❌ SOME TESTS FAILED")
-        print("=" * 70)
+            verdict = "❌ SOME TESTS FAILED"
+        lines += ["", BANNER, verdict, BANNER]
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
         
         return 0 if all_passed else 1
-
+    
+    @staticmethod
+    def suite_results(junitxml):
+        """Return the tests/ subdirectories that ran and that failed in a JUnit XML report
+        
+        Returns a (ran, failed) pair of sets, or None when the report is
+        missing or unreadable.
+        """
+        try:
+            tree = ET.parse(junitxml)
+        except (OSError, ET.ParseError):
+            return None
+        
+        ran, failed = set(), set()
+        for testcase in tree.iter("testcase"):
+            # classname is the dotted module path, e.g. tests.unit.test_x.TestX
+            parts = testcase.get("classname", "").split(".")
+            if len(parts) < 2 or parts[0] != "tests":
+                continue
+            ran.add(parts[1])
+            if testcase.find("failure") is not None or testcase.find("error") is not None:
+                failed.add(parts[1])
+        return ran, failed
 
 def main():
     """Main entry point"""
@@ -169,6 +349,7 @@ Examples:
   python tests/run_tests.py --unit          # Run unit tests only
   python tests/run_tests.py --web --verbose # Run web tests with verbose output
   python tests/run_tests.py --fast --coverage # Run fast tests with coverage
+  python tests/run_tests.py --changed       # Run only tests affected by local changes
         """
     )
     
@@ -183,20 +364,49 @@ Examples:
     suite_group.add_argument('--misc', action='store_true',
                            help='Run miscellaneous tests')
     suite_group.add_argument('--fast', action='store_true',
-                           help='Run fast tests (unit tests only)')
+                           help='Run fast tests (unit tests not marked slow)')
+    
+    # Positional form used by older callers: unit | integration | specific NAME
+    parser.add_argument('legacy_suite', nargs='?', metavar='{unit,integration,specific}',
+                       choices=['unit', 'integration', 'specific'],
+                       help=argparse.SUPPRESS)
+    parser.add_argument('legacy_name', nargs='?', metavar='NAME',
+                       help=argparse.SUPPRESS)
     
     # Options
     parser.add_argument('--verbose', '-v', action='store_true',
                        help='Verbose output')
     parser.add_argument('--coverage', '-c', action='store_true',
                        help='Run with coverage report')
+    parser.add_argument('--exitfirst', '-x', action='store_true',
+                       help='Stop at the first failing test or script')
+    parser.add_argument('--changed', action='store_true',
+                       help='Run only tests affected by local changes (needs pytest-testmon)')
+    parser.add_argument('--jobs', '-j', metavar='N',
+                       help='Parallel pytest workers, a number or "auto" '
+                            '(default: auto with pytest-xdist installed, else 0)')
+    parser.add_argument('--max-processes', type=int, metavar='N',
+                       help='Upper limit on parallel workers')
     
     args = parser.parse_args()
     
-    runner = TestRunner()
+    if args.legacy_suite == 'specific':
+        if not args.legacy_name:
+            parser.error("specific requires a test name")
+    elif args.legacy_name:
+        parser.error(f"unexpected argument: {args.legacy_name}")
+    elif args.legacy_suite == 'unit':
+        args.unit = True
+    elif args.legacy_suite == 'integration':
+        args.integration = True
+    
+    runner = TestRunner(jobs=args.jobs, max_processes=args.max_processes,
+                        exitfirst=args.exitfirst, changed=args.changed)
     
     # Run selected test suite
-    if args.unit:
+    if args.legacy_suite == 'specific':
+        return runner.run_specific_test(args.legacy_name, args.verbose, args.coverage)
+    elif args.unit:
         return runner.run_unit_tests(args.verbose, args.coverage)
     elif args.integration:
         return runner.run_integration_tests(args.verbose, args.coverage)
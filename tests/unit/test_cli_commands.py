@@ -2,19 +2,18 @@
 Unit tests for CLI commands
 """
 
+import io
 import unittest
 import tempfile
+import copy
 import os
-import sys
-import json
-import subprocess
-from unittest.mock import patch, MagicMock, mock_open
+import logging
+from contextlib import redirect_stdout
+from unittest.mock import patch, Mock
 from pathlib import Path
-import argparse
-
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from types import MappingProxyType, SimpleNamespace
 
+import main
 from main import (
     create_parser, 
     handle_process, 
@@ -26,127 +25,136 @@ from main import (
     handle_wildcard,
     get_default_config
 )
+from src.processors.directory_processor import DirectoryProcessor
+from src.viewers.web_interface import WebInterface
+from src.analyzers.llm_manager import LLMManager
+from src.database.db_manager import DatabaseManager
+from src.utils.wildcard_generator import WildcardGenerator
+
+
+# Process command arguments; tests copy this and set input/output
+_PROCESS_ARGS = SimpleNamespace(
+    input=None,
+    output=None,
+    api_url='http://localhost:7860',
+    clip_model='ViT-L-14/openai',
+    clip_modes=['best', 'fast'],
+    enable_clip=True,
+    disable_clip=False,
+    enable_llm=True,
+    disable_llm=False,
+    enable_metadata=True,
+    disable_metadata=False,
+    enable_parallel=False,
+    disable_parallel=False,
+    enable_summaries=False,
+    disable_summaries=False,
+    parallel=False,
+    force=False,
+    debug=False,
+    verbose=False,
+    quiet=False,
+    timeout=300,
+    retry_limit=3,
+    max_file_size=10485760,
+    allowed_extensions=['.jpg', '.jpeg', '.png'],
+    no_interactive=False,
+    prompt_choices=['P1', 'P2']
+)
+
+# llm-config arguments with every action off; tests copy this and set one
+_LLM_ARGS_BASE = SimpleNamespace(
+    list=False,
+    list_configured=False,
+    add_ollama=None,
+    add_openai=None,
+    remove=None,
+    test_ollama=False,
+    test_openai=False,
+    ollama_url='http://localhost:11434',
+    openai_key=None
+)
+
+# llm-config cases: (name, argument overrides, manager return values keyed by
+# ('llm' | 'db', method), expected ('llm' | 'db', method) call, exit code)
+_LLM_CONFIG_CASES = [
+    ('list', {'list': True},
+     {('llm', 'get_all_available_models'): [
+         {'name': 'gpt-4', 'type': 'openai', 'size': '175B'},
+         {'name': 'llama2', 'type': 'ollama', 'size': '7B'}
+     ]}, None, 0),
+    ('list_configured', {'list_configured': True},
+     {('db', 'get_llm_models'): [
+         {'id': 1, 'name': 'gpt-4', 'type': 'openai'},
+         {'id': 2, 'name': 'llama2', 'type': 'ollama'}
+     ]}, None, 0),
+    ('add_ollama', {'add_ollama': 'llama2'}, {}, ('db', 'insert_llm_model'), 0),
+    ('add_openai', {'add_openai': 'gpt-4', 'openai_key': 'test_key'}, {}, ('db', 'insert_llm_model'), 0),
+    # Fails without an API key
+    ('add_openai_no_key', {'add_openai': 'gpt-4'}, {}, None, 1),
+    ('test_ollama', {'test_ollama': True},
+     {('llm', 'test_ollama_connection'): True}, ('llm', 'test_ollama_connection'), 0),
+    ('test_openai', {'test_openai': True},
+     {('llm', 'test_openai_connection'): True}, ('llm', 'test_openai_connection'), 0),
+]
+
+
+# Read-only database results and stats shared by the wildcard, view and
+# database tests; the handlers never mutate them
+_SINGLE_RESULT = ({'filename': 'test.jpg', 'directory': 'Images'},)
+_LANDSCAPE_RESULT = ({'filename': 'test.jpg', 'directory': 'Images/landscapes'},)
+_LISTED_RESULTS = (
+    {'id': 1, 'filename': 'image1.jpg', 'date_added': '2024-01-01'},
+    {'id': 2, 'filename': 'image2.jpg', 'date_added': '2024-01-02'},
+)
+_DB_STATS = MappingProxyType({
+    'total_results': 10,
+    'recent_results': 5,
+    'llm_models': 3
+})
+
 
 class TestCLICommands(unittest.TestCase):
     """Test cases for CLI command functionality"""
     
-    def setUp(self):
-        """Set up test fixtures"""
-        self.temp_dir = tempfile.mkdtemp()
-        self.test_images_dir = os.path.join(self.temp_dir, "Images")
-        self.test_output_dir = os.path.join(self.temp_dir, "Output")
-        
-        # Create test directories
-        os.makedirs(self.test_images_dir, exist_ok=True)
-        os.makedirs(self.test_output_dir, exist_ok=True)
-        
-        # Create test image files
-        for i in range(3):
-            with open(os.path.join(self.test_images_dir, f"test_image_{i}.jpg"), 'w') as f:
-                f.write(f"test image content {i}")
+    # Only handed to mocked generators; never created on disk
+    test_output_dir = "Output"
     
-    def tearDown(self):
-        """Clean up test fixtures"""
-        import shutil
-        shutil.rmtree(self.temp_dir)
+    @classmethod
+    def setUpClass(cls):
+        """Build the argument parser once for the class"""
+        # The handlers' log output isn't checked; skip building the records
+        logging.disable(logging.CRITICAL)
+        cls._parser = create_parser()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Restore logging"""
+        logging.disable(logging.NOTSET)
+    
+    def _get_parser(self):
+        """Return the parser shared by the class"""
+        return self._parser
     
     def test_create_parser(self):
         """Test argument parser creation"""
-        parser = create_parser()
+        parser = self._get_parser()
         
         # Test that all subcommands exist
-        subcommands = ['process', 'web', 'config', 'llm-config', 'view', 'database', 'wildcard']
-        for cmd in subcommands:
-            self.assertIn(cmd, parser._subparsers._group_actions[0].choices)
-    
-    def test_process_command_basic(self):
-        """Test basic process command"""
-        args = argparse.Namespace(
-            input=self.test_images_dir,
-            output=self.test_output_dir,
-            api_url='http://localhost:7860',
-            clip_model='ViT-L-14/openai',
-            clip_modes=['best', 'fast'],
-            enable_clip=True,
-            disable_clip=False,
-            enable_llm=True,
-            disable_llm=False,
-            enable_metadata=True,
-            disable_metadata=False,
-            enable_parallel=False,
-            disable_parallel=False,
-            enable_summaries=False,
-            disable_summaries=False,
-            parallel=False,
-            force=False,
-            debug=False,
-            verbose=False,
-            quiet=False,
-            timeout=300,
-            retry_limit=3,
-            max_file_size=10485760,
-            allowed_extensions=['.jpg', '.jpeg', '.png'],
-            no_interactive=False,
-            prompt_choices=['P1', 'P2']
-        )
-        
-        with patch('main.DirectoryProcessor') as mock_processor:
-            mock_instance = MagicMock()
-            mock_processor.return_value = mock_instance
-            
-            result = handle_process(args)
-            
-            # Should call process_directory
-            mock_instance.process_directory.assert_called_once()
-            self.assertEqual(result, 0)
-    
-    def test_process_command_with_errors(self):
-        """Test process command with errors"""
-        args = argparse.Namespace(
-            input=self.test_images_dir,
-            output=self.test_output_dir,
-            api_url='http://localhost:7860',
-            clip_model='ViT-L-14/openai',
-            clip_modes=['best', 'fast'],
-            enable_clip=True,
-            disable_clip=False,
-            enable_llm=True,
-            disable_llm=False,
-            verbose=False,
-            quiet=False,
-            enable_metadata=True,
-            disable_metadata=False,
-            enable_parallel=False,
-            disable_parallel=False,
-            enable_summaries=False,
-            disable_summaries=False,
-            parallel=False,
-            force=False,
-            debug=False,
-            timeout=300,
-            retry_limit=3,
-            max_file_size=10485760,
-            allowed_extensions=['.jpg', '.jpeg', '.png'],
-            no_interactive=False,
-            prompt_choices=['P1', 'P2']
-        )
-        
-        with patch('main.DirectoryProcessor') as mock_processor:
-            mock_processor.side_effect = Exception("Test error")
-            
-            result = handle_process(args)
-            self.assertEqual(result, 1)
+        subcommands = frozenset(['process', 'web', 'config', 'llm-config', 'view', 'database', 'wildcard'])
+        choices = parser._subparsers._group_actions[0].choices
+        self.assertEqual(subcommands - choices.keys(), frozenset())
     
     def test_web_command(self):
         """Test web command"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             host='127.0.0.1',
             port=8080,
             debug=True
         )
         
         with patch('main.WebInterface') as mock_web_interface:
-            mock_instance = MagicMock()
+            mock_instance = Mock(spec=WebInterface)
             mock_web_interface.return_value = mock_instance
             
             result = handle_web(args)
@@ -161,7 +169,7 @@ class TestCLICommands(unittest.TestCase):
     
     def test_web_command_with_errors(self):
         """Test web command with errors"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             host='127.0.0.1',
             port=8080,
             debug=True
@@ -175,37 +183,37 @@ class TestCLICommands(unittest.TestCase):
     
     def test_config_command_show(self):
         """Test config command with show option"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             show=True,
             interactive=False,
             reset=False
         )
         
-        with patch('builtins.print') as mock_print:
+        with redirect_stdout(io.StringIO()) as out:
             result = handle_config(args)
             
             # Should print configuration
-            mock_print.assert_called()
+            self.assertTrue(out.getvalue())
             self.assertEqual(result, 0)
     
     def test_config_command_reset(self):
         """Test config command with reset option"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             show=False,
             interactive=False,
             reset=True
         )
         
-        with patch('builtins.print') as mock_print:
+        with redirect_stdout(io.StringIO()) as out:
             result = handle_config(args)
             
             # Should print reset message
-            mock_print.assert_called()
+            self.assertTrue(out.getvalue())
             self.assertEqual(result, 0)
     
     def test_config_command_interactive(self):
         """Test config command with interactive option"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             show=False,
             interactive=True,
             reset=False,
@@ -217,355 +225,9 @@ class TestCLICommands(unittest.TestCase):
         # Interactive mode is not implemented, returns 0
         self.assertEqual(result, 0)
     
-    def test_llm_config_command_list(self):
-        """Test LLM config command with list option"""
-        args = argparse.Namespace(
-            list=True,
-            list_configured=False,
-            add_ollama=None,
-            add_openai=None,
-            remove=None,
-            test_ollama=False,
-            test_openai=False,
-            ollama_url='http://localhost:11434',
-            openai_key=None
-        )
-        
-        with patch('main.LLMManager') as mock_llm_manager, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_llm = MagicMock()
-            mock_llm_manager.return_value = mock_llm
-            mock_llm.get_all_available_models.return_value = [
-                {'name': 'gpt-4', 'type': 'openai', 'size': '175B'},
-                {'name': 'llama2', 'type': 'ollama', 'size': '7B'}
-            ]
-            
-            result = handle_llm_config(args)
-            
-            # Should list available models
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_llm_config_command_list_configured(self):
-        """Test LLM config command with list-configured option"""
-        args = argparse.Namespace(
-            list=False,
-            list_configured=True,
-            add_ollama=None,
-            add_openai=None,
-            remove=None,
-            test_ollama=False,
-            test_openai=False,
-            ollama_url='http://localhost:11434',
-            openai_key=None
-        )
-        
-        with patch('main.LLMManager') as mock_llm_manager, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_db = MagicMock()
-            mock_db_manager.return_value = mock_db
-            mock_db.get_llm_models.return_value = [
-                {'id': 1, 'name': 'gpt-4', 'type': 'openai'},
-                {'id': 2, 'name': 'llama2', 'type': 'ollama'}
-            ]
-            
-            result = handle_llm_config(args)
-            
-            # Should list configured models
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_llm_config_command_add_ollama(self):
-        """Test LLM config command with add-ollama option"""
-        args = argparse.Namespace(
-            list=False,
-            list_configured=False,
-            add_ollama='llama2',
-            add_openai=None,
-            remove=None,
-            test_ollama=False,
-            test_openai=False,
-            ollama_url='http://localhost:11434',
-            openai_key=None
-        )
-        
-        with patch('main.LLMManager') as mock_llm_manager, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_db = MagicMock()
-            mock_db_manager.return_value = mock_db
-            
-            result = handle_llm_config(args)
-            
-            # Should add Ollama model
-            mock_db.insert_llm_model.assert_called_once()
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_llm_config_command_add_openai(self):
-        """Test LLM config command with add-openai option"""
-        args = argparse.Namespace(
-            list=False,
-            list_configured=False,
-            add_ollama=None,
-            add_openai='gpt-4',
-            remove=None,
-            test_ollama=False,
-            test_openai=False,
-            ollama_url='http://localhost:11434',
-            openai_key='test_key'
-        )
-        
-        with patch('main.LLMManager') as mock_llm_manager, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_db = MagicMock()
-            mock_db_manager.return_value = mock_db
-            
-            result = handle_llm_config(args)
-            
-            # Should add OpenAI model
-            mock_db.insert_llm_model.assert_called_once()
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_llm_config_command_add_openai_no_key(self):
-        """Test LLM config command with add-openai but no key"""
-        args = argparse.Namespace(
-            list=False,
-            list_configured=False,
-            add_ollama=None,
-            add_openai='gpt-4',
-            remove=None,
-            test_ollama=False,
-            test_openai=False,
-            ollama_url='http://localhost:11434',
-            openai_key=None
-        )
-        
-        with patch('main.LLMManager') as mock_llm_manager, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            result = handle_llm_config(args)
-            
-            # Should fail without API key
-            mock_print.assert_called()
-            self.assertEqual(result, 1)
-    
-    def test_llm_config_command_test_ollama(self):
-        """Test LLM config command with test-ollama option"""
-        args = argparse.Namespace(
-            list=False,
-            list_configured=False,
-            add_ollama=None,
-            add_openai=None,
-            remove=None,
-            test_ollama=True,
-            test_openai=False,
-            ollama_url='http://localhost:11434',
-            openai_key=None
-        )
-        
-        with patch('main.LLMManager') as mock_llm_manager, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_llm = MagicMock()
-            mock_llm_manager.return_value = mock_llm
-            mock_llm.test_ollama_connection.return_value = True
-            
-            result = handle_llm_config(args)
-            
-            # Should test Ollama connection
-            mock_llm.test_ollama_connection.assert_called_once()
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_llm_config_command_test_openai(self):
-        """Test LLM config command with test-openai option"""
-        args = argparse.Namespace(
-            list=False,
-            list_configured=False,
-            add_ollama=None,
-            add_openai=None,
-            remove=None,
-            test_ollama=False,
-            test_openai=True,
-            ollama_url='http://localhost:11434',
-            openai_key=None
-        )
-        
-        with patch('main.LLMManager') as mock_llm_manager, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_llm = MagicMock()
-            mock_llm_manager.return_value = mock_llm
-            mock_llm.test_openai_connection.return_value = True
-            
-            result = handle_llm_config(args)
-            
-            # Should test OpenAI connection
-            mock_llm.test_openai_connection.assert_called_once()
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_view_command_list(self):
-        """Test view command with list option"""
-        args = argparse.Namespace(
-            list=True,
-            file=None,
-            summary=False,
-            export=None,
-            output=None
-        )
-        
-        with patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_db = MagicMock()
-            mock_db_manager.return_value = mock_db
-            mock_db.get_all_results.return_value = [
-                {'id': 1, 'filename': 'image1.jpg', 'date_added': '2024-01-01'},
-                {'id': 2, 'filename': 'image2.jpg', 'date_added': '2024-01-02'}
-            ]
-            
-            result = handle_view(args)
-            
-            # Should list results
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_view_command_file(self):
-        """Test view command with file option"""
-        test_file = os.path.join(self.test_output_dir, "test_analysis.json")
-        with open(test_file, 'w') as f:
-            json.dump({'test': 'data'}, f)
-        
-        args = argparse.Namespace(
-            list=False,
-            file=test_file,
-            summary=False,
-            export=None,
-            output=None
-        )
-        
-        with patch('builtins.print') as mock_print:
-            result = handle_view(args)
-            
-            # Should view file
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_view_command_summary(self):
-        """Test view command with summary option"""
-        args = argparse.Namespace(
-            list=False,
-            file=None,
-            summary=True,
-            export=None,
-            output=None
-        )
-        
-        with patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_db = MagicMock()
-            mock_db_manager.return_value = mock_db
-            mock_db.get_stats.return_value = {
-                'total_results': 10,
-                'recent_results': 5,
-                'llm_models': 3
-            }
-            
-            result = handle_view(args)
-            
-            # Should show summary
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_database_command_stats(self):
-        """Test database command with stats option"""
-        args = argparse.Namespace(
-            stats=True,
-            clear=False,
-            backup=None,
-            restore=None
-        )
-        
-        with patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_db = MagicMock()
-            mock_db_manager.return_value = mock_db
-            mock_db.get_stats.return_value = {
-                'total_results': 10,
-                'recent_results': 5,
-                'llm_models': 3
-            }
-            
-            result = handle_database(args)
-            
-            # Should show stats
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_database_command_clear(self):
-        """Test database command with clear option"""
-        args = argparse.Namespace(
-            stats=False,
-            clear=True,
-            backup=None,
-            restore=None
-        )
-        
-        with patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_db = MagicMock()
-            mock_db_manager.return_value = mock_db
-            mock_db.clear_database.return_value = True
-            
-            result = handle_database(args)
-            
-            # Should clear database
-            mock_db.clear_database.assert_called_once()
-            mock_print.assert_called()
-            self.assertEqual(result, 0)
-    
-    def test_database_command_clear_failure(self):
-        """Test database command with clear option failure"""
-        args = argparse.Namespace(
-            stats=False,
-            clear=True,
-            backup=None,
-            restore=None
-        )
-        
-        with patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
-            
-            mock_db = MagicMock()
-            mock_db_manager.return_value = mock_db
-            mock_db.clear_database.return_value = False
-            
-            result = handle_database(args)
-            
-            # Should fail
-            mock_db.clear_database.assert_called_once()
-            mock_print.assert_called()
-            self.assertEqual(result, 1)
-    
     def test_wildcard_command_groups(self):
         """Test wildcard command with groups option"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             output=self.test_output_dir,
             groups=True,
             combined=False,
@@ -574,32 +236,31 @@ class TestCLICommands(unittest.TestCase):
         )
         
         with patch('src.utils.wildcard_generator.WildcardGenerator') as mock_generator_class, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
+             patch.object(main, 'DatabaseManager') as mock_db_manager, \
+             redirect_stdout(io.StringIO()) as out:
             
-            mock_generator = MagicMock()
+            mock_generator = Mock(spec=WildcardGenerator)
+            mock_generator.wildcards_dir = self.test_output_dir  # set in __init__
             mock_generator_class.return_value = mock_generator
             mock_generator.generate_wildcards_from_results.return_value = {
                 'landscapes': 'path/to/landscapes.txt',
                 'portraits': 'path/to/portraits.txt'
             }
             
-            mock_db = MagicMock()
+            mock_db = Mock(spec=DatabaseManager)
             mock_db_manager.return_value = mock_db
-            mock_db.get_all_results.return_value = [
-                {'filename': 'test.jpg', 'directory': 'Images/landscapes'}
-            ]
+            mock_db.get_all_results.return_value = _LANDSCAPE_RESULT
             
             result = handle_wildcard(args)
             
             # Should generate group wildcards
             mock_generator.generate_wildcards_from_results.assert_called_once()
-            mock_print.assert_called()
+            self.assertTrue(out.getvalue())
             self.assertEqual(result, 0)
     
     def test_wildcard_command_combined(self):
         """Test wildcard command with combined option"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             output=self.test_output_dir,
             groups=False,
             combined=True,
@@ -608,29 +269,28 @@ class TestCLICommands(unittest.TestCase):
         )
         
         with patch('src.utils.wildcard_generator.WildcardGenerator') as mock_generator_class, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
+             patch.object(main, 'DatabaseManager') as mock_db_manager, \
+             redirect_stdout(io.StringIO()) as out:
             
-            mock_generator = MagicMock()
+            mock_generator = Mock(spec=WildcardGenerator)
+            mock_generator.wildcards_dir = self.test_output_dir  # set in __init__
             mock_generator_class.return_value = mock_generator
             mock_generator.generate_combined_wildcard.return_value = 'path/to/combined.txt'
             
-            mock_db = MagicMock()
+            mock_db = Mock(spec=DatabaseManager)
             mock_db_manager.return_value = mock_db
-            mock_db.get_all_results.return_value = [
-                {'filename': 'test.jpg', 'directory': 'Images'}
-            ]
+            mock_db.get_all_results.return_value = _SINGLE_RESULT
             
             result = handle_wildcard(args)
             
             # Should generate combined wildcard
             mock_generator.generate_combined_wildcard.assert_called_once()
-            mock_print.assert_called()
+            self.assertTrue(out.getvalue())
             self.assertEqual(result, 0)
     
     def test_wildcard_command_all(self):
         """Test wildcard command with all option"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             output=self.test_output_dir,
             groups=False,
             combined=False,
@@ -639,20 +299,19 @@ class TestCLICommands(unittest.TestCase):
         )
         
         with patch('src.utils.wildcard_generator.WildcardGenerator') as mock_generator_class, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
+             patch.object(main, 'DatabaseManager') as mock_db_manager, \
+             redirect_stdout(io.StringIO()) as out:
             
-            mock_generator = MagicMock()
+            mock_generator = Mock(spec=WildcardGenerator)
+            mock_generator.wildcards_dir = self.test_output_dir  # set in __init__
             mock_generator_class.return_value = mock_generator
             mock_generator.generate_wildcards_from_results.return_value = {'test': 'path.txt'}
             mock_generator.generate_combined_wildcard.return_value = 'path/to/combined.txt'
             mock_generator.generate_group_combinations.return_value = {'combo': 'path.txt'}
             
-            mock_db = MagicMock()
+            mock_db = Mock(spec=DatabaseManager)
             mock_db_manager.return_value = mock_db
-            mock_db.get_all_results.return_value = [
-                {'filename': 'test.jpg', 'directory': 'Images'}
-            ]
+            mock_db.get_all_results.return_value = _SINGLE_RESULT
             
             result = handle_wildcard(args)
             
@@ -660,12 +319,12 @@ class TestCLICommands(unittest.TestCase):
             mock_generator.generate_wildcards_from_results.assert_called_once()
             mock_generator.generate_combined_wildcard.assert_called_once()
             mock_generator.generate_group_combinations.assert_called_once()
-            mock_print.assert_called()
+            self.assertTrue(out.getvalue())
             self.assertEqual(result, 0)
     
     def test_wildcard_command_no_results(self):
         """Test wildcard command with no database results"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             output=self.test_output_dir,
             groups=True,
             combined=False,
@@ -674,22 +333,22 @@ class TestCLICommands(unittest.TestCase):
         )
         
         with patch('src.utils.wildcard_generator.WildcardGenerator') as mock_generator_class, \
-             patch('main.DatabaseManager') as mock_db_manager, \
-             patch('builtins.print') as mock_print:
+             patch.object(main, 'DatabaseManager') as mock_db_manager, \
+             redirect_stdout(io.StringIO()) as out:
             
-            mock_db = MagicMock()
+            mock_db = Mock(spec=DatabaseManager)
             mock_db_manager.return_value = mock_db
             mock_db.get_all_results.return_value = []
             
             result = handle_wildcard(args)
             
             # Should fail with no results
-            mock_print.assert_called()
+            self.assertTrue(out.getvalue())
             self.assertEqual(result, 1)
     
     def test_wildcard_command_import_error(self):
         """Test wildcard command with import error"""
-        args = argparse.Namespace(
+        args = SimpleNamespace(
             output=self.test_output_dir,
             groups=True,
             combined=False,
@@ -698,12 +357,12 @@ class TestCLICommands(unittest.TestCase):
         )
         
         with patch('src.utils.wildcard_generator.WildcardGenerator', side_effect=ImportError("Test import error")), \
-             patch('builtins.print') as mock_print:
+             redirect_stdout(io.StringIO()) as out:
             
             result = handle_wildcard(args)
             
             # Should handle import error
-            mock_print.assert_called()
+            self.assertTrue(out.getvalue())
             self.assertEqual(result, 1)
     
     def test_get_default_config(self):
@@ -711,25 +370,253 @@ class TestCLICommands(unittest.TestCase):
         config = get_default_config()
         
         # Check required keys exist (based on actual default config)
-        required_keys = [
+        required_keys = {
             'API_BASE_URL', 'CLIP_MODEL_NAME', 'ENABLE_CLIP_ANALYSIS',
             'ENABLE_LLM_ANALYSIS', 'IMAGE_DIRECTORY', 'OUTPUT_DIRECTORY',
             'CLIP_MODES', 'CLIP_API_TIMEOUT', 'WEB_PORT'
-        ]
-        
-        for key in required_keys:
-            self.assertIn(key, config)
-        
-        # Check data types for keys that exist
-        self.assertIsInstance(config['ENABLE_CLIP_ANALYSIS'], bool)
-        self.assertIsInstance(config['ENABLE_LLM_ANALYSIS'], bool)
-        self.assertIsInstance(config['CLIP_MODES'], list)
-        self.assertIsInstance(config['CLIP_API_TIMEOUT'], int)
-        self.assertIsInstance(config['WEB_PORT'], int)
+        }
+        self.assertFalse(required_keys - config.keys(), "missing keys")
+        
+        # Check data types; the message names each key with its actual type
+        expected_types = {
+            'ENABLE_CLIP_ANALYSIS': bool,
+            'ENABLE_LLM_ANALYSIS': bool,
+            'CLIP_MODES': list,
+            'CLIP_API_TIMEOUT': int,
+            'WEB_PORT': int
+        }
+        wrong_types = {key: type(config[key]).__name__
+                       for key, expected in expected_types.items()
+                       if not isinstance(config[key], expected)}
+        self.assertFalse(wrong_types, "wrong types")
         
         # PROMPT_CHOICES may not be in default config
         if 'PROMPT_CHOICES' in config:
             self.assertIsInstance(config['PROMPT_CHOICES'], list)
 
+
+class TestCLIFileIO(unittest.TestCase):
+    """Test cases for CLI commands that touch the filesystem"""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Create the test directories once for the class"""
+        logging.disable(logging.CRITICAL)
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.test_images_dir = os.path.join(cls.temp_dir, "Images")
+        cls.test_output_dir = os.path.join(cls.temp_dir, "Output")
+        
+        # handle_process checks the input directory exists and creates both
+        os.makedirs(cls.test_images_dir, exist_ok=True)
+        os.makedirs(cls.test_output_dir, exist_ok=True)
+        
+        # Create test image files; nothing reads their content
+        for i in range(3):
+            Path(cls.test_images_dir, f"test_image_{i}.jpg").touch()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Clean up test fixtures"""
+        import shutil
+        shutil.rmtree(cls.temp_dir)
+        logging.disable(logging.NOTSET)
+    
+    def test_process_command_basic(self):
+        """Test basic process command"""
+        args = copy.copy(_PROCESS_ARGS)
+        args.input = self.test_images_dir
+        args.output = self.test_output_dir
+        
+        with patch('main.DirectoryProcessor') as mock_processor:
+            mock_instance = Mock(spec=DirectoryProcessor)
+            mock_processor.return_value = mock_instance
+            
+            result = handle_process(args)
+            
+            # Should call process_directory
+            mock_instance.process_directory.assert_called_once()
+            self.assertEqual(result, 0)
+    
+    def test_process_command_with_errors(self):
+        """Test process command with errors"""
+        args = copy.copy(_PROCESS_ARGS)
+        args.input = self.test_images_dir
+        args.output = self.test_output_dir
+        
+        with patch('main.DirectoryProcessor') as mock_processor:
+            mock_processor.side_effect = Exception("Test error")
+            
+            result = handle_process(args)
+            self.assertEqual(result, 1)
+    
+    def test_view_command_file(self):
+        """Test view command with file option"""
+        import json
+        with tempfile.NamedTemporaryFile('w', suffix='_analysis.json', dir=self.test_output_dir,
+                                         delete=False) as f:
+            json.dump({'test': 'data'}, f)
+        test_file = f.name
+        
+        args = SimpleNamespace(
+            list=False,
+            file=test_file,
+            summary=False,
+            export=None,
+            output=None
+        )
+        
+        with redirect_stdout(io.StringIO()) as out:
+            result = handle_view(args)
+            
+            # Should view file
+            self.assertTrue(out.getvalue())
+            self.assertEqual(result, 0)
+
+
+@patch.object(main, 'DatabaseManager')
+@patch.object(main, 'LLMManager')
+class TestCLIManagerCommands(unittest.TestCase):
+    """Test cases for the llm-config, view and database commands
+    
+    LLMManager and DatabaseManager are patched for every test and passed in as
+    mock_llm_manager and mock_db_manager; stdout is captured per call.
+    """
+    
+    @classmethod
+    def setUpClass(cls):
+        """Silence logging for the class; log output isn't checked"""
+        logging.disable(logging.CRITICAL)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Restore logging"""
+        logging.disable(logging.NOTSET)
+    
+    def test_llm_config_command(self, mock_llm_manager, mock_db_manager):
+        """Test LLM config command options, one subtest per option"""
+        for name, overrides, return_values, expected_call, expected_result in _LLM_CONFIG_CASES:
+            with self.subTest(name=name):
+                mocks = {'llm': Mock(spec=LLMManager), 'db': Mock(spec=DatabaseManager)}
+                mock_llm_manager.return_value = mocks['llm']
+                mock_db_manager.return_value = mocks['db']
+                for (target, method), value in return_values.items():
+                    getattr(mocks[target], method).return_value = value
+                
+                args = copy.copy(_LLM_ARGS_BASE)
+                vars(args).update(overrides)
+                with redirect_stdout(io.StringIO()) as out:
+                    result = handle_llm_config(args)
+                
+                if expected_call:
+                    target, method = expected_call
+                    getattr(mocks[target], method).assert_called_once()
+                self.assertTrue(out.getvalue())
+                self.assertEqual(result, expected_result)
+    
+    def test_view_command_list(self, mock_llm_manager, mock_db_manager):
+        """Test view command with list option"""
+        args = SimpleNamespace(
+            list=True,
+            file=None,
+            summary=False,
+            export=None,
+            output=None
+        )
+        
+        mock_db = Mock(spec=DatabaseManager)
+        mock_db_manager.return_value = mock_db
+        mock_db.get_all_results.return_value = _LISTED_RESULTS
+        
+        with redirect_stdout(io.StringIO()) as out:
+            result = handle_view(args)
+        
+        # Should list results
+        self.assertTrue(out.getvalue())
+        self.assertEqual(result, 0)
+    
+    def test_view_command_summary(self, mock_llm_manager, mock_db_manager):
+        """Test view command with summary option"""
+        args = SimpleNamespace(
+            list=False,
+            file=None,
+            summary=True,
+            export=None,
+            output=None
+        )
+        
+        mock_db = Mock(spec=DatabaseManager)
+        mock_db_manager.return_value = mock_db
+        mock_db.get_stats.return_value = _DB_STATS
+        
+        with redirect_stdout(io.StringIO()) as out:
+            result = handle_view(args)
+        
+        # Should show summary
+        self.assertTrue(out.getvalue())
+        self.assertEqual(result, 0)
+    
+    def test_database_command_stats(self, mock_llm_manager, mock_db_manager):
+        """Test database command with stats option"""
+        args = SimpleNamespace(
+            stats=True,
+            clear=False,
+            backup=None,
+            restore=None
+        )
+        
+        mock_db = Mock(spec=DatabaseManager)
+        mock_db_manager.return_value = mock_db
+        mock_db.get_stats.return_value = _DB_STATS
+        
+        with redirect_stdout(io.StringIO()) as out:
+            result = handle_database(args)
+        
+        # Should show stats
+        self.assertTrue(out.getvalue())
+        self.assertEqual(result, 0)
+    
+    def test_database_command_clear(self, mock_llm_manager, mock_db_manager):
+        """Test database command with clear option"""
+        args = SimpleNamespace(
+            stats=False,
+            clear=True,
+            backup=None,
+            restore=None
+        )
+        
+        mock_db = Mock(spec=DatabaseManager)
+        mock_db_manager.return_value = mock_db
+        mock_db.clear_database.return_value = True
+        
+        with redirect_stdout(io.StringIO()) as out:
+            result = handle_database(args)
+        
+        # Should clear database
+        mock_db.clear_database.assert_called_once()
+        self.assertTrue(out.getvalue())
+        self.assertEqual(result, 0)
+    
+    def test_database_command_clear_failure(self, mock_llm_manager, mock_db_manager):
+        """Test database command with clear option failure"""
+        args = SimpleNamespace(
+            stats=False,
+            clear=True,
+            backup=None,
+            restore=None
+        )
+        
+        mock_db = Mock(spec=DatabaseManager)
+        mock_db_manager.return_value = mock_db
+        mock_db.clear_database.return_value = False
+        
+        with redirect_stdout(io.StringIO()) as out:
+            result = handle_database(args)
+        
+        # Should fail
+        mock_db.clear_database.assert_called_once()
+        self.assertTrue(out.getvalue())
+        self.assertEqual(result, 1)
+
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -2,295 +2,437 @@
 Unit tests for CLIP analyzer module with proper API mocking
 """
 
-import unittest
-from unittest.mock import patch, MagicMock, Mock
-import sys
-import os
-import tempfile
+import base64
+import hashlib
+import json
 import shutil
+import threading
 from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch, Mock, DEFAULT, call
+import pytest
 import requests
-
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
 
 from src.analyzers.clip_analyzer import (
     analyze_image_with_clip, 
     process_image_with_clip,
-    get_authenticated_session
+    get_authenticated_session,
+    clear_analysis_cache,
+    clear_session_cache,
+    compute_md5
 )
 
-class TestCLIPAnalyzer(unittest.TestCase):
-    """Test cases for CLIP analyzer functionality"""
-    
-    def setUp(self):
-        """Set up test fixtures"""
-        # Create temporary directory
-        self.temp_dir = tempfile.mkdtemp()
-        self.test_image_path = os.path.join(self.temp_dir, "test_image.jpg")
-        
-        # Create a valid JPEG image file (minimal valid JPEG)
-        with open(self.test_image_path, 'wb') as f:
-            # Minimal valid JPEG header
-            f.write(b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x01\x00H\x00H\x00\x00\xff\xdb\x00C\x00\x08\x06\x06\x07\x06\x05\x08\x07\x07\x07\t\t\x08\n\x0c\x14\r\x0c\x0b\x0b\x0c\x19\x12\x13\x0f\x14\x1d\x1a\x1f\x1e\x1d\x1a\x1c\x1c $.\' ",#\x1c\x1c(7),01444\x1f\'9=82<.342\xff\xc0\x00\x11\x08\x00\x01\x00\x01\x01\x01\x11\x00\x02\x11\x01\x03\x11\x01\xff\xc4\x00\x14\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x08\xff\xc4\x00\x14\x10\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xff\xda\x00\x0c\x03\x01\x00\x02\x11\x03\x11\x00\x3f\x00\xaa\xff\xd9')
-        
-        self.api_base_url = "http://localhost:7860"
-        self.model_name = "ViT-L-14/openai"
-        self.modes = ["best", "fast"]
-    
-    def tearDown(self):
-        """Clean up test fixtures"""
-        shutil.rmtree(self.temp_dir)
-    
-    @patch('src.analyzers.clip_analyzer.get_authenticated_session')
-    def test_analyze_image_with_clip_success(self, mock_get_session):
-        """Test successful CLIP analysis"""
-        # Mock authenticated session
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
-        # Mock successful API responses for each mode
-        mock_response_best = MagicMock()
-        mock_response_best.status_code = 200
-        mock_response_best.json.return_value = {
-            "status": "success",
-            "prompt": "A beautiful landscape with mountains"
-        }
-        
-        mock_response_fast = MagicMock()
-        mock_response_fast.status_code = 200
-        mock_response_fast.json.return_value = {
-            "status": "success",
-            "prompt": "Nature scene"
-        }
-        
-        # Return different responses for different modes
-        def side_effect(*args, **kwargs):
-            if 'best' in str(kwargs.get('json', {}).get('mode', '')):
-                return mock_response_best
-            return mock_response_fast
-        
-        mock_session.post.side_effect = side_effect
-        
-        result = analyze_image_with_clip(
-            image_path=self.test_image_path,
-            api_base_url=self.api_base_url,
-            model=self.model_name,
-            modes=self.modes
-        )
-        
-        self.assertEqual(result["status"], "success")
-        self.assertIn("results", result)
-        self.assertIn("best", result["results"])
-        self.assertIn("fast", result["results"])
-        self.assertEqual(mock_session.post.call_count, 2)
-    
-    @patch('src.analyzers.clip_analyzer.get_authenticated_session')
-    def test_analyze_image_with_clip_api_error(self, mock_get_session):
-        """Test CLIP analysis with API error"""
-        # Mock authenticated session
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
-        # Mock API error response
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("500 Internal Server Error")
-        mock_session.post.return_value = mock_response
-        
-        result = analyze_image_with_clip(
-            image_path=self.test_image_path,
-            api_base_url=self.api_base_url,
-            model=self.model_name,
-            modes=self.modes
-        )
-        
-        self.assertEqual(result["status"], "success")  # Function returns success with error in results
-        self.assertIn("results", result)
-        # Check that errors are in the results
-        for mode in self.modes:
-            if mode in result["results"]:
-                self.assertEqual(result["results"][mode]["status"], "error")
-    
-    @patch('src.analyzers.clip_analyzer.get_authenticated_session')
-    def test_analyze_image_with_clip_connection_error(self, mock_get_session):
-        """Test CLIP analysis with connection error"""
-        # Mock authenticated session
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
-        # Mock connection error
-        mock_session.post.side_effect = requests.exceptions.ConnectionError("Connection failed")
-        
-        result = analyze_image_with_clip(
-            image_path=self.test_image_path,
-            api_base_url=self.api_base_url,
-            model=self.model_name,
-            modes=self.modes
-        )
-        
-        self.assertEqual(result["status"], "success")  # Function returns success with error in results
-        self.assertIn("results", result)
-    
-    @patch('src.analyzers.clip_analyzer.get_authenticated_session')
-    def test_analyze_image_with_clip_timeout(self, mock_get_session):
-        """Test CLIP analysis with timeout"""
-        # Mock authenticated session
-        mock_session = MagicMock()
-        mock_get_session.return_value = mock_session
-        
-        # Mock timeout error
-        mock_session.post.side_effect = requests.exceptions.Timeout("Request timed out")
-        
-        result = analyze_image_with_clip(
-            image_path=self.test_image_path,
-            api_base_url=self.api_base_url,
-            model=self.model_name,
-            modes=self.modes
-        )
-        
-        self.assertEqual(result["status"], "success")  # Function returns success with error in results
-        self.assertIn("results", result)
+# Minimal valid 1x1 JPEG
+MINIMAL_JPEG = Path(__file__).parent.parent / "fixtures" / "minimal.jpg"
+
+
+def _resp(status, payload=None, exc=None):
+    """Build a requests.Response mock with the given status and JSON body"""
+    response = Mock(spec=Response)
+    response.status_code = status
+    response.json.return_value = payload
+    if exc is not None:
+        response.raise_for_status.side_effect = exc
+    return response
+
+
+def _fake_session():
+    """Build a requests.Session mock for get_authenticated_session to return
     
-    def test_analyze_image_with_clip_invalid_image_path(self):
-        """Test CLIP analysis with invalid image path"""
-        result = analyze_image_with_clip(
-            image_path="nonexistent_image.jpg",
-            api_base_url=self.api_base_url,
-            model=self.model_name,
-            modes=self.modes
-        )
-        
-        self.assertEqual(result["status"], "error")
-        self.assertIn("Image file not found", result["message"])
+    Spec'd on the class imported at module load, since some tests patch
+    requests.Session itself.
+    """
+    return Mock(spec=Session)
+
+
+class _FakeCLIPAdapter(HTTPAdapter):
+    """Transport answering CLIP API requests from canned per-mode outcomes
     
-    def test_analyze_image_with_clip_no_api_url(self):
-        """Test CLIP analysis with no API URL"""
-        result = analyze_image_with_clip(
-            image_path=self.test_image_path,
-            api_base_url="",
-            model=self.model_name,
-            modes=self.modes
-        )
-        
-        self.assertEqual(result["status"], "error")
-        self.assertIn("API base URL not provided", result["message"])
+    An outcome is a (status, payload) pair or an exception to raise. Requests
+    to /interrogator/ endpoints are recorded as (endpoint, mode).
+    """
     
-    def test_analyze_image_with_clip_no_modes(self):
-        """Test CLIP analysis with no modes"""
+    def __init__(self):
+        super().__init__()
+        self.outcomes = {}
+        self.default = (200, {"status": "success", "prompt": "Test result"})
+        self.requests = []
+    
+    def send(self, request, **kwargs):
+        body = json.loads(request.body) if request.body and request.body[:1] in (b'{', '{') else {}
+        mode = body.get("mode")
+        if "/interrogator/" in request.url:
+            self.requests.append((request.url.rsplit("/", 1)[-1], mode))
+        outcome = self.outcomes.get(mode, self.default)
+        if isinstance(outcome, Exception):
+            raise outcome
+        response = Response()
+        response.status_code, payload = outcome
+        response._content = json.dumps(payload).encode()
+        response.headers["Content-Type"] = "application/json"
+        response.url = request.url
+        response.request = request
+        return response
+
+
+# Prebuilt transport errors shared by the error cases
+_HTTP_500 = requests.exceptions.HTTPError("500 Internal Server Error")
+_CONN_ERR = requests.exceptions.ConnectionError("Connection failed")
+_TIMEOUT_ERR = requests.exceptions.Timeout("Request timed out")
+
+# (HTTP status, or None when the transport raises the exception; expected message fragment)
+_CLIP_ERROR_CASES = [
+    pytest.param(500, _HTTP_500, "HTTP error", id="api_error"),
+    pytest.param(None, _CONN_ERR, "Cannot connect", id="connection_error"),
+    pytest.param(None, _TIMEOUT_ERR, "timed out", id="timeout"),
+]
+
+
+API_BASE_URL = "http://localhost:7860"
+MODEL_NAME = "ViT-L-14/openai"
+MODES = ["best", "fast"]
+FIXED_MD5 = "0123456789abcdef0123456789abcdef"
+
+
+@pytest.fixture(scope="module")
+def test_image_path(tmp_path_factory):
+    """Test image shared by the module; no test modifies it"""
+    image_path = tmp_path_factory.mktemp("clip") / "test_image.jpg"
+    shutil.copy(MINIMAL_JPEG, image_path)
+    return str(image_path)
+
+
+@pytest.fixture
+def clip_api(monkeypatch):
+    """Fake CLIP API mounted on the real sessions get_authenticated_session builds"""
+    adapter = _FakeCLIPAdapter()
+    monkeypatch.setattr('src.analyzers.clip_analyzer.HTTPAdapter', lambda **kwargs: adapter)
+    return adapter
+
+
+@pytest.fixture
+def clip_env():
+    """Patch the database, prompt, analyze, session and hashing seams of process_image_with_clip
+    
+    compute_md5 returns FIXED_MD5; test_compute_md5_cached_until_file_changes covers the real hash.
+    """
+    with patch.multiple('src.analyzers.clip_analyzer', db_manager=DEFAULT, prompt_image=DEFAULT,
+                        analyze_image_with_clip=DEFAULT, get_authenticated_session=DEFAULT,
+                        compute_md5=DEFAULT) as mocks:
+        mocks['compute_md5'].return_value = FIXED_MD5
+        yield SimpleNamespace(db=mocks['db_manager'], prompt=mocks['prompt_image'],
+                              analyze=mocks['analyze_image_with_clip'],
+                              session=mocks['get_authenticated_session'])
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start each test without cached analyses or sessions"""
+    clear_analysis_cache()
+    clear_session_cache()
+
+
+def test_analyze_image_with_clip_success(clip_api, test_image_path):
+    """Test successful CLIP analysis"""
+    # Mock successful API responses for each mode
+    clip_api.outcomes = {
+        "best": (200, {"status": "success", "prompt": "A beautiful landscape with mountains"}),
+        "fast": (200, {"status": "success", "prompt": "Nature scene"})
+    }
+    
+    result = analyze_image_with_clip(
+        image_path=test_image_path,
+        api_base_url=API_BASE_URL,
+        model=MODEL_NAME,
+        modes=MODES
+    )
+    
+    assert result["status"] == "success"
+    assert result["results"]["best"]["prompt"] == "A beautiful landscape with mountains"
+    assert result["results"]["fast"]["prompt"] == "Nature scene"
+    assert len(clip_api.requests) == 2
+
+
+@pytest.mark.parametrize("status,error,message", _CLIP_ERROR_CASES)
+def test_analyze_image_with_clip_errors(clip_api, test_image_path, status, error, message):
+    """Test CLIP analysis with API, connection and timeout errors"""
+    clip_api.default = error if status is None else (status, {"detail": str(error)})
+    
+    result = analyze_image_with_clip(
+        image_path=test_image_path,
+        api_base_url=API_BASE_URL,
+        model=MODEL_NAME,
+        modes=MODES
+    )
+    
+    assert result["status"] == "success"  # Function returns success with error in results
+    # Check that errors are in the results
+    for mode in MODES:
+        assert result["results"][mode]["status"] == "error"
+        assert message in result["results"][mode]["message"]
+
+
+def test_analyze_image_with_clip_retries_refused_connection(test_image_path):
+    """Test a refused connection is retried twice, with backoff, before the mode fails"""
+    with patch('urllib3.util.connection.create_connection',
+               side_effect=ConnectionRefusedError("Connection refused")) as mock_connect, \
+         patch('urllib3.util.retry.time.sleep') as mock_sleep:
         result = analyze_image_with_clip(
-            image_path=self.test_image_path,
-            api_base_url=self.api_base_url,
-            model=self.model_name,
-            modes=[]
+            image_path=test_image_path,
+            api_base_url=API_BASE_URL,
+            model=MODEL_NAME,
+            modes=["best"],
+            password=""
         )
-        
-        self.assertEqual(result["status"], "error")
-        self.assertIn("No analysis modes specified", result["message"])
-    
-    @patch('src.analyzers.clip_analyzer.get_authenticated_session')
-    @patch('src.analyzers.clip_analyzer.db_manager')
-    @patch('src.analyzers.clip_analyzer.prompt_image')
-    @patch('src.analyzers.clip_analyzer.analyze_image_with_clip')
-    def test_process_image_with_clip_success(self, mock_analyze, mock_prompt, mock_db, mock_get_session):
-        """Test process_image_with_clip function"""
-        # Mock database
-        mock_db.get_result_by_md5.return_value = None  # No existing result
-        mock_db.insert_result.return_value = None
-        
-        # Mock prompt generation
-        mock_prompt.return_value = {
-            "status": "success",
-            "prompt": {
-                "best": {"status": "success", "prompt": "Test result"},
-                "fast": {"status": "success", "prompt": "Test result"}
-            }
-        }
-        
-        # Mock analysis
-        mock_analyze.return_value = {
-            "status": "success",
-            "model": self.model_name,
-            "modes": self.modes,
-            "results": {
-                "best": {"status": "success", "prompt": "Test result"},
-                "fast": {"status": "success", "prompt": "Test result"}
-            }
+    
+    # One attempt plus two retries; only the second retry backs off (0.2 * 2)
+    assert mock_connect.call_count == 3
+    assert mock_sleep.call_args_list == [call(pytest.approx(0.4))]
+    # The exhausted retries still surface as a connection error
+    assert result["results"]["best"]["status"] == "error"
+    assert "Cannot connect" in result["results"]["best"]["message"]
+
+
+@patch('src.analyzers.clip_analyzer.get_authenticated_session')
+def test_analyze_image_with_clip_modes_concurrent(mock_get_session, test_image_path):
+    """Test modes are requested concurrently rather than one after another"""
+    mock_session = _fake_session()
+    mock_get_session.return_value = mock_session
+    
+    # Each request waits for the other; a sequential loop would time out
+    barrier = threading.Barrier(len(MODES), timeout=5)
+    def side_effect(*args, **kwargs):
+        barrier.wait()
+        return _resp(200, {"status": "success", "prompt": kwargs['json']['mode']})
+    mock_session.post.side_effect = side_effect
+    
+    result = analyze_image_with_clip(test_image_path, API_BASE_URL, MODEL_NAME, MODES)
+    
+    for mode in MODES:
+        assert result["results"][mode]["prompt"] == mode
+
+
+def test_analyze_image_with_clip_cache_hit(clip_api, test_image_path):
+    """Test repeated analysis of the same image is served from the cache"""
+    first = analyze_image_with_clip(test_image_path, API_BASE_URL, MODEL_NAME, MODES)
+    second = analyze_image_with_clip(test_image_path, API_BASE_URL, MODEL_NAME,
+                                     list(reversed(MODES)))
+    
+    assert len(clip_api.requests) == len(MODES)
+    assert second["results"] == first["results"]
+    
+    # force_reprocess bypasses the cache
+    analyze_image_with_clip(test_image_path, API_BASE_URL, MODEL_NAME, MODES,
+                            force_reprocess=True)
+    assert len(clip_api.requests) == 2 * len(MODES)
+
+
+def test_analyze_image_with_clip_invalid_image_path():
+    """Test CLIP analysis with invalid image path"""
+    result = analyze_image_with_clip(
+        image_path="nonexistent_image.jpg",
+        api_base_url=API_BASE_URL,
+        model=MODEL_NAME,
+        modes=MODES
+    )
+    
+    assert result["status"] == "error"
+    assert "Image file not found" in result["message"]
+
+
+def test_analyze_image_with_clip_no_api_url(test_image_path):
+    """Test CLIP analysis with no API URL"""
+    result = analyze_image_with_clip(
+        image_path=test_image_path,
+        api_base_url="",
+        model=MODEL_NAME,
+        modes=MODES
+    )
+    
+    assert result["status"] == "error"
+    assert "API base URL not provided" in result["message"]
+
+
+def test_analyze_image_with_clip_no_modes(test_image_path):
+    """Test CLIP analysis with no modes"""
+    result = analyze_image_with_clip(
+        image_path=test_image_path,
+        api_base_url=API_BASE_URL,
+        model=MODEL_NAME,
+        modes=[]
+    )
+    
+    assert result["status"] == "error"
+    assert "No analysis modes specified" in result["message"]
+
+
+def test_compute_md5_cached_until_file_changes(tmp_path):
+    """Test the image hash is read once and recomputed after the file changes"""
+    jpeg_bytes = MINIMAL_JPEG.read_bytes()
+    image_path = tmp_path / "md5_image.jpg"
+    image_path.write_bytes(jpeg_bytes)
+    
+    with patch('builtins.open', wraps=open) as mock_file:
+        first = compute_md5(str(image_path))
+        assert compute_md5(str(image_path)) == first
+        assert mock_file.call_count == 1
+    assert first == hashlib.md5(jpeg_bytes).hexdigest()
+    
+    image_path.write_bytes(jpeg_bytes + b'\x00')
+    assert compute_md5(str(image_path)) == hashlib.md5(jpeg_bytes + b'\x00').hexdigest()
+
+
+_REAL_MD5 = hashlib.md5
+
+
+def _md5_without_usedforsecurity(data=b''):
+    """hashlib.md5 as on Python 3.8, which rejects the usedforsecurity keyword"""
+    return _REAL_MD5(data)
+
+
+@pytest.mark.parametrize("md5_factory", [_REAL_MD5, _md5_without_usedforsecurity],
+                         ids=["hashlib", "no_usedforsecurity"])
+def test_compute_md5_never_unknown_for_readable_file(md5_factory, test_image_path):
+    """Test a readable file always gets its real digest, never the "unknown" fallback"""
+    with patch('src.analyzers.clip_analyzer.hashlib.md5', side_effect=md5_factory):
+        digest = compute_md5(test_image_path)
+    
+    assert digest != "unknown"
+    assert digest == hashlib.md5(MINIMAL_JPEG.read_bytes()).hexdigest()
+
+
+def test_process_image_with_clip_success(clip_env, test_image_path):
+    """Test process_image_with_clip function"""
+    # Mock database
+    clip_env.db.get_result_by_md5.return_value = None  # No existing result
+    clip_env.db.insert_result.return_value = None
+    
+    # Mock prompt generation
+    clip_env.prompt.return_value = {
+        "status": "success",
+        "prompt": {
+            "best": {"status": "success", "prompt": "Test result"},
+            "fast": {"status": "success", "prompt": "Test result"}
         }
-        
-        result = process_image_with_clip(
-            image_path=self.test_image_path,
-            api_base_url=self.api_base_url,
-            model=self.model_name,
-            modes=self.modes
-        )
-        
-        self.assertEqual(result["status"], "success")
-        self.assertIn("filename", result)
-        self.assertIn("analysis_results", result)
-        mock_db.insert_result.assert_called()
-    
-    @patch('src.analyzers.clip_analyzer.get_authenticated_session')
-    @patch('src.analyzers.clip_analyzer.db_manager')
-    def test_process_image_with_clip_from_database(self, mock_db, mock_get_session):
-        """Test process_image_with_clip retrieves from database"""
-        # Mock database returning existing result
-        existing_result = {
-            "file_info": {"filename": "test_image.jpg"},
-            "analysis": {"clip": {"best": {"prompt": "Cached result"}}}
+    }
+    
+    # Mock analysis
+    clip_env.analyze.return_value = {
+        "status": "success",
+        "model": MODEL_NAME,
+        "modes": MODES,
+        "results": {
+            "best": {"status": "success", "prompt": "Test result"},
+            "fast": {"status": "success", "prompt": "Test result"}
         }
-        mock_db.get_result_by_md5.return_value = existing_result
-        
+    }
+    
+    result = process_image_with_clip(
+        image_path=test_image_path,
+        api_base_url=API_BASE_URL,
+        model=MODEL_NAME,
+        modes=MODES
+    )
+    
+    assert result["status"] == "success"
+    assert "filename" in result
+    assert "analysis_results" in result
+    assert clip_env.db.insert_result.call_count >= 1
+
+
+@patch('src.analyzers.clip_analyzer.db_manager')
+def test_process_image_with_clip_encodes_once(mock_db, clip_api, test_image_path):
+    """Test the prompt and analyze requests share one base64 encoding"""
+    mock_db.get_result_by_md5.return_value = None
+    
+    with patch('src.analyzers.clip_analyzer.base64.b64encode', wraps=base64.b64encode) as mock_encode:
         result = process_image_with_clip(
-            image_path=self.test_image_path,
-            api_base_url=self.api_base_url,
-            model=self.model_name,
-            modes=self.modes,
-            force_reprocess=False
+            image_path=test_image_path,
+            api_base_url=API_BASE_URL,
+            model=MODEL_NAME,
+            modes=MODES
         )
-        
-        self.assertEqual(result["status"], "success")
-        self.assertTrue(result.get("from_database", False))
-        # Should not call API
-        mock_get_session.assert_not_called()
-    
-    @patch('src.analyzers.clip_analyzer.requests.Session')
-    def test_get_authenticated_session_with_password(self, mock_session_class):
-        """Test authenticated session creation with password"""
-        # Mock session
-        mock_session = MagicMock()
-        mock_session_class.return_value = mock_session
-        
-        # Mock login response
-        mock_login_response = MagicMock()
-        mock_login_response.status_code = 200
-        mock_session.post.return_value = mock_login_response
-        
-        # Mock session cookie
-        mock_session.cookies = {'connect.sid': 'test_session_id'}
-        
-        # Mock info endpoint for session validation
-        mock_info_response = MagicMock()
-        mock_info_response.status_code = 200
-        mock_session.get.return_value = mock_info_response
-        
-        session = get_authenticated_session(self.api_base_url, password="test_password")
-        
-        self.assertIsNotNone(session)
-        mock_session.post.assert_called()
-    
-    @patch('src.analyzers.clip_analyzer.requests.Session')
-    def test_get_authenticated_session_no_password(self, mock_session_class):
-        """Test session creation without password"""
-        # Mock session
-        mock_session = MagicMock()
-        mock_session_class.return_value = mock_session
-        
-        session = get_authenticated_session(self.api_base_url, password=None)
-        
-        self.assertIsNotNone(session)
-        # Should not call login endpoint
-        mock_session.post.assert_not_called()
+    
+    assert result["status"] == "success"
+    assert mock_encode.call_count == 1
+    # One prompt and one analyze request per mode
+    assert sorted(clip_api.requests) == sorted((endpoint, mode) for endpoint in ("analyze", "prompt")
+                                               for mode in MODES)
+
+
+def test_process_image_with_clip_from_database(clip_env, test_image_path):
+    """Test process_image_with_clip retrieves from database"""
+    # Mock database returning existing result
+    existing_result = {
+        "file_info": {"filename": "test_image.jpg"},
+        "analysis": {"clip": {"best": {"prompt": "Cached result"}}}
+    }
+    clip_env.db.get_result_by_md5.return_value = existing_result
+    
+    result = process_image_with_clip(
+        image_path=test_image_path,
+        api_base_url=API_BASE_URL,
+        model=MODEL_NAME,
+        modes=MODES,
+        force_reprocess=False
+    )
+    
+    assert result["status"] == "success"
+    assert result.get("from_database", False)
+    assert clip_env.db.get_result_by_md5.call_args == call(FIXED_MD5)
+    # Should not call API
+    assert clip_env.session.call_count == 0
+
+
+@patch('src.analyzers.clip_analyzer.requests.Session')
+def test_get_authenticated_session_with_password(mock_session_class):
+    """Test authenticated session creation with password"""
+    # Mock session
+    mock_session = _fake_session()
+    mock_session_class.return_value = mock_session
+    
+    # Mock login response
+    mock_session.post.return_value = _resp(200)
+    
+    # Mock session cookie
+    mock_session.cookies = {'connect.sid': 'test_session_id'}
+    
+    # Mock info endpoint for session validation
+    mock_session.get.return_value = _resp(200)
+    
+    session = get_authenticated_session(API_BASE_URL, password="test_password")
+    
+    assert session is not None
+    assert mock_session.post.call_count >= 1
+
+
+@patch('src.analyzers.clip_analyzer.requests.Session')
+def test_get_authenticated_session_no_password(mock_session_class):
+    """Test session creation without password"""
+    # Mock session
+    mock_session = _fake_session()
+    mock_session_class.return_value = mock_session
+    
+    session = get_authenticated_session(API_BASE_URL, password=None)
+    
+    assert session is not None
+    # Should not call login endpoint
+    assert mock_session.post.call_count == 0
+
+
+@patch('src.analyzers.clip_analyzer.requests.Session')
+def test_get_authenticated_session_is_cached(mock_session_class):
+    """Test sessions are reused per URL and password"""
+    mock_session_class.side_effect = lambda: _fake_session()
+    
+    session = get_authenticated_session(API_BASE_URL, password="")
+    
+    assert get_authenticated_session(API_BASE_URL, password="") is session
+    assert get_authenticated_session("http://other:7860", password="") is not session
+    assert mock_session_class.call_count == 2
+
 
 if __name__ == '__main__':
-    unittest.main() 
\ No newline at end of file
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,48 @@
+"""
+Unit tests for scripts/comprehensive_test_fix.py
+"""
+
+import pytest
+from scripts import comprehensive_test_fix
+
+PASSING_TEST = "def test_ok():\n    assert True\n"
+FAILING_TEST = "def test_broken():\n    assert 1 == 2\n"
+
+
+@pytest.mark.slow
+def test_run_unit_tests_reports_failing_file(tmp_path, monkeypatch):
+    """A failing test file is reported as FAIL, the others as PASS
+    
+    Colors are forced, as a --color=yes in the user's addopts would, since
+    ANSI codes in the output must not hide failures.
+    """
+    unit_dir = tmp_path / "tests" / "unit"
+    unit_dir.mkdir(parents=True)
+    (unit_dir / "test_config_manager.py").write_text(FAILING_TEST)
+    (unit_dir / "test_installer.py").write_text(PASSING_TEST)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("PYTEST_ADDOPTS", "--color=yes")
+
+    results = dict(comprehensive_test_fix.run_unit_tests())
+
+    assert results["tests/unit/test_config_manager.py"] == "FAIL"
+    assert results["tests/unit/test_installer.py"] == "PASS"
+    assert results["tests/unit/test_metadata_extractor.py"] == "NOT_FOUND"
+
+
+def test_failed_test_files_reads_junit_report(tmp_path):
+    """Failures and errors map back to their file; passing cases do not"""
+    report = tmp_path / "results.xml"
+    report.write_text(
+        '<testsuites><testsuite>'
+        '<testcase classname="tests.unit.test_a.TestA" name="test_x"><failure/></testcase>'
+        '<testcase classname="tests.unit.test_b" name="test_y"><error/></testcase>'
+        '<testcase classname="tests.unit.test_c" name="test_z"/>'
+        '</testsuite></testsuites>'
+    )
+    files = ["tests/unit/test_a.py", "tests/unit/test_b.py", "tests/unit/test_c.py"]
+
+    assert comprehensive_test_fix.failed_test_files(report, files) == {
+        "tests/unit/test_a.py", "tests/unit/test_b.py"
+    }
+    assert comprehensive_test_fix.failed_test_files(tmp_path / "missing.xml", files) is None
@@ -2,6 +2,7 @@
 Unit tests for config manager module
 """
 
+import io
 import unittest
 from unittest.mock import patch, MagicMock, mock_open
 import sys
@@ -10,14 +11,14 @@ from pathlib import Path
 import tempfile
 import shutil
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-
 from src.config.config_manager import (
     get_config_value,
     get_all_config,
     save_config_file,
     load_config_file,
+    update_private_config,
+    read_config_stream,
+    write_config_stream,
     load_env_file,
     validate_api_key,
     check_clip_connection,
@@ -26,86 +27,89 @@ from src.config.config_manager import (
     setup_initial_config
 )
 
+# Canned HTTP responses shared by the connection tests
+_RESP_200 = MagicMock(status_code=200)
+_RESP_401 = MagicMock(status_code=401)
+_RESP_500 = MagicMock(status_code=500)
+_RESP_LLM_OK = MagicMock(status_code=200)
+_RESP_LLM_OK.json.return_value = {"choices": [{"message": {"content": "test"}}]}
+
 class TestConfigManager(unittest.TestCase):
     """Test cases for config manager functionality"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary root shared by every test in the class"""
+        cls.temp_root = tempfile.mkdtemp()
+        # One requests.get/post patch for the whole class; setUp resets the mocks
+        get_patcher = patch('requests.get')
+        post_patcher = patch('requests.post')
+        cls.mock_get = get_patcher.start()
+        cls.mock_post = post_patcher.start()
+        cls.addClassCleanup(get_patcher.stop)
+        cls.addClassCleanup(post_patcher.stop)
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the shared temporary root"""
+        shutil.rmtree(cls.temp_root)
+    
     def setUp(self):
         """Set up test fixtures"""
-        self.temp_dir = tempfile.mkdtemp()
+        self.temp_dir = os.path.join(self.temp_root, self._testMethodName)
+        os.mkdir(self.temp_dir)
         self.test_env_path = os.path.join(self.temp_dir, ".env")
-        
-    def tearDown(self):
-        """Clean up test fixtures"""
-        shutil.rmtree(self.temp_dir)
+        self.mock_get.reset_mock(return_value=True, side_effect=True)
+        self.mock_post.reset_mock(return_value=True, side_effect=True)
     
-    @patch('requests.get')
-    def test_validate_api_key_success(self, mock_get):
+    def test_validate_api_key_success(self):
         """Test successful API key validation"""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        self.mock_get.return_value = _RESP_200
         
         result = validate_api_key("test_api_key", "https://api.test.com")
         self.assertTrue(result)
-        mock_get.assert_called_once()
+        self.mock_get.assert_called_once()
     
-    @patch('requests.get')
-    def test_validate_api_key_failure(self, mock_get):
+    def test_validate_api_key_failure(self):
         """Test failed API key validation"""
-        mock_response = MagicMock()
-        mock_response.status_code = 401
-        mock_get.return_value = mock_response
+        self.mock_get.return_value = _RESP_401
         
         result = validate_api_key("invalid_api_key", "https://api.test.com")
         self.assertFalse(result)
     
-    @patch('requests.get')
-    def test_validate_api_key_connection_error(self, mock_get):
+    def test_validate_api_key_connection_error(self):
         """Test API key validation with connection error"""
-        mock_get.side_effect = Exception("Connection failed")
+        self.mock_get.side_effect = Exception("Connection failed")
         
         result = validate_api_key("test_api_key", "https://api.test.com")
         self.assertFalse(result)
     
-    @patch('requests.get')
-    def test_test_clip_connection_success(self, mock_get):
+    def test_test_clip_connection_success(self):
         """Test successful CLIP connection"""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        self.mock_get.return_value = _RESP_200
         
         result = check_clip_connection("http://localhost:7860")
         self.assertTrue(result)
-        mock_get.assert_called_once()
+        self.mock_get.assert_called_once()
     
-    @patch('requests.get')
-    def test_test_clip_connection_failure(self, mock_get):
+    def test_test_clip_connection_failure(self):
         """Test failed CLIP connection"""
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_get.return_value = mock_response
+        self.mock_get.return_value = _RESP_500
         
         result = check_clip_connection("http://localhost:7860")
         self.assertFalse(result)
     
-    @patch('requests.post')
-    def test_test_llm_connection_success(self, mock_post):
+    def test_test_llm_connection_success(self):
         """Test successful LLM connection"""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {"choices": [{"message": {"content": "test"}}]}
-        mock_post.return_value = mock_response
+        self.mock_post.return_value = _RESP_LLM_OK
         
         result = check_llm_connection("https://api.openai.com/v1", "test_key", "gpt-4")
         self.assertTrue(result)
-        mock_post.assert_called_once()
+        self.mock_post.assert_called_once()
     
-    @patch('requests.post')
-    def test_test_llm_connection_failure(self, mock_post):
+    def test_test_llm_connection_failure(self):
         """Test failed LLM connection"""
-        mock_response = MagicMock()
-        mock_response.status_code = 401
-        mock_post.return_value = mock_response
+        self.mock_post.return_value = _RESP_401
         
         result = check_llm_connection("https://api.openai.com/v1", "invalid_key", "gpt-4")
         self.assertFalse(result)
@@ -119,28 +123,98 @@ class TestConfigManager(unittest.TestCase):
             }
         }
         
-        with patch('builtins.open', mock_open()) as mock_file:
+        with patch.dict(os.environ, {'CONFIG_FSYNC': 'True'}), \
+             patch('os.fsync') as mock_fsync:
             result = save_config_file(config, self.temp_dir)
             self.assertTrue(result)
-            mock_file.assert_called()
+            mock_fsync.assert_called_once()
+        
+        self.assertEqual(os.listdir(self.temp_dir), ['config.json'])
+        self.assertEqual(load_config_file(self.temp_dir), config)
+    
+    def test_save_config_skips_fsync_by_default(self):
+        """Test config writes are only fsync'ed when CONFIG_FSYNC opts in"""
+        with patch.dict(os.environ), patch('os.fsync') as mock_fsync:
+            os.environ.pop('CONFIG_FSYNC', None)
+            self.assertTrue(save_config_file({"clip_config": {}}, self.temp_dir))
+            mock_fsync.assert_not_called()
+    
+    @unittest.skipIf(os.name == 'nt', "POSIX permission bits")
+    def test_update_private_config_keeps_file_mode(self):
+        """Test rewriting .env keeps the permissions the user set on it"""
+        with open(self.test_env_path, 'w', encoding='utf-8') as f:
+            f.write("OPENAI_API_KEY=old\n")
+        os.chmod(self.test_env_path, 0o600)
+        
+        self.assertTrue(update_private_config({'OPENAI_API_KEY': 'new'}, self.temp_dir))
+        
+        self.assertEqual(os.stat(self.test_env_path).st_mode & 0o777, 0o600)
+        self.assertEqual(os.listdir(self.temp_dir), ['.env'])
+        with open(self.test_env_path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), "OPENAI_API_KEY=new\n")
+    
+    def test_update_private_config_empty_updates(self):
+        """Test an empty update leaves .env untouched"""
+        with patch('src.config.config_manager._write_file_atomic') as mock_write:
+            self.assertTrue(update_private_config({}, self.temp_dir))
+            mock_write.assert_not_called()
     
     def test_load_config(self):
-        """Test loading configuration from config.json file"""
-        config_content = '{"clip_config": {"api_url": "http://localhost:7860", "model_name": "ViT-L-14/openai"}}'
+        """Test loading configuration from config.json content"""
+        config_content = b'{"clip_config": {"api_url": "http://localhost:7860", "model_name": "ViT-L-14/openai"}}'
         
-        with patch('builtins.open', mock_open(read_data=config_content)), \
-             patch('os.path.exists', return_value=True):
-            config = load_config_file(self.temp_dir)
+        config = read_config_stream(io.BytesIO(config_content))
             
         self.assertIn("clip_config", config)
         self.assertEqual(config["clip_config"]["api_url"], "http://localhost:7860")
     
+    def test_config_stream_round_trip(self):
+        """Test configuration written to a stream reads back unchanged"""
+        config = {"clip_config": {"api_url": "http://localhost:7860", "clip_modes": ["best", "fast"]}}
+        buf = io.BytesIO()
+        
+        write_config_stream(config, buf)
+        
+        self.assertEqual(read_config_stream(io.BytesIO(buf.getvalue())), config)
+    
     def test_load_config_file_not_found(self):
         """Test loading configuration when file doesn't exist"""
         with patch('os.path.exists', return_value=False):
             config = load_config_file(self.temp_dir)
         self.assertIsInstance(config, dict)
-    
+
+    def test_load_config_cached_until_saved(self):
+        """Test repeated loads reuse the parsed file until it is saved again"""
+        save_config_file({"clip_config": {"model_name": "ViT-L-14/openai"}}, self.temp_dir)
+
+        first = load_config_file(self.temp_dir)
+        first["clip_config"]["model_name"] = "mutated"
+        with patch('builtins.open') as mock_file:
+            second = load_config_file(self.temp_dir)
+            mock_file.assert_not_called()
+        self.assertEqual(second["clip_config"]["model_name"], "ViT-L-14/openai")
+
+        save_config_file({"clip_config": {"model_name": "ViT-B-32/openai"}}, self.temp_dir)
+        self.assertEqual(load_config_file(self.temp_dir)["clip_config"]["model_name"], "ViT-B-32/openai")
+
+    def test_load_env_file_restores_removed_keys(self):
+        """Test reloading an unchanged .env puts back keys removed from os.environ"""
+        with open(self.test_env_path, 'w', encoding='utf-8') as f:
+            f.write("CLIP_TEST_RELOAD_KEY=from_env_file\n")
+        
+        with patch.dict(os.environ):
+            self.assertTrue(load_env_file(self.temp_dir))
+            self.assertEqual(os.environ['CLIP_TEST_RELOAD_KEY'], 'from_env_file')
+            
+            del os.environ['CLIP_TEST_RELOAD_KEY']
+            self.assertTrue(load_env_file(self.temp_dir))
+            self.assertEqual(os.environ['CLIP_TEST_RELOAD_KEY'], 'from_env_file')
+            
+            # Variables already set in the environment still take precedence
+            os.environ['CLIP_TEST_RELOAD_KEY'] = 'from_environment'
+            load_env_file(self.temp_dir)
+            self.assertEqual(os.environ['CLIP_TEST_RELOAD_KEY'], 'from_environment')
+
     @patch('builtins.input', side_effect=['y', 'http://localhost:7860', 'ViT-L-14/openai'])
     @patch('src.config.config_manager.check_clip_connection', return_value=True)
     def test_main_interactive_setup(self, mock_test, mock_input):
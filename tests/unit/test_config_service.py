@@ -4,6 +4,7 @@ Unit tests for ConfigService
 
 import unittest
 import tempfile
+import shutil
 import os
 from unittest.mock import patch, mock_open
 from src.services.config_service import ConfigService
@@ -12,16 +13,22 @@ from src.services.config_service import ConfigService
 class TestConfigService(unittest.TestCase):
     """Test cases for ConfigService"""
     
+    @classmethod
+    def setUpClass(cls):
+        """Create one temporary root shared by every test in the class"""
+        cls.temp_root = tempfile.mkdtemp()
+    
+    @classmethod
+    def tearDownClass(cls):
+        """Remove the shared temporary root"""
+        shutil.rmtree(cls.temp_root)
+    
     def setUp(self):
         """Set up test fixtures"""
-        self.temp_dir = tempfile.mkdtemp()
+        self.temp_dir = os.path.join(self.temp_root, self._testMethodName)
+        os.mkdir(self.temp_dir)
         self.service = ConfigService(self.temp_dir)
     
-    def tearDown(self):
-        """Clean up test fixtures"""
-        import shutil
-        shutil.rmtree(self.temp_dir)
-    
     @patch('src.services.config_service.get_combined_config')
     def test_get_config_with_env_vars(self, mock_get_combined_config):
         """Test getting configuration with environment variables"""
@@ -104,7 +111,36 @@ class TestConfigService(unittest.TestCase):
         result = self.service.update_config(config_data)
         # The function returns True if at least one update succeeds
         self.assertTrue(result)
-    
+
+    @patch('src.services.config_service.get_combined_config')
+    def test_get_config_cached_until_update(self, mock_get_combined_config):
+        """Test get_config reuses the flattened view until update_config runs"""
+        mock_get_combined_config.return_value = {'private': {}, 'public': {}}
+
+        first = self.service.get_config()
+        first['CLIP_MODES'].append('mutated')
+        second = self.service.get_config()
+        self.assertEqual(mock_get_combined_config.call_count, 1)
+        self.assertEqual(second['CLIP_MODES'], ['best', 'fast', 'classic'])
+
+        with patch('src.services.config_service.update_public_config', return_value=True):
+            self.service.update_config({'API_BASE_URL': 'http://test:8000'})
+        self.service.get_config()
+        self.assertEqual(mock_get_combined_config.call_count, 2)
+
+    @patch('src.services.config_service.get_combined_config')
+    def test_get_config_cache_tracks_environment(self, mock_get_combined_config):
+        """Test get_config rebuilds when an environment variable it reads changes"""
+        mock_get_combined_config.side_effect = lambda root: {
+            'private': {'web_port': int(os.environ.get('WEB_PORT', '5050'))}, 'public': {}
+        }
+        
+        with patch.dict(os.environ, {'WEB_PORT': '8080'}):
+            self.assertEqual(self.service.get_config()['WEB_PORT'], 8080)
+            os.environ['WEB_PORT'] = '9090'
+            self.assertEqual(self.service.get_config()['WEB_PORT'], 9090)
+        self.assertEqual(mock_get_combined_config.call_count, 2)
+
     def test_get_processing_config(self):
         """Test getting processing configuration"""
         with patch.object(self.service, 'get_config') as mock_get_config:
@@ -132,65 +168,35 @@ class TestConfigService(unittest.TestCase):
             self.assertEqual(config['IMAGE_DIRECTORY'], os.path.join(self.temp_dir, 'Images'))
             self.assertEqual(config['OUTPUT_DIRECTORY'], os.path.join(self.temp_dir, 'Output'))
     
-    def test_validate_config_valid(self):
-        """Test validating valid configuration"""
-        config_data = {
-            'API_BASE_URL': 'http://test:8000',
-            'CLIP_MODEL_NAME': 'test-model',
-            'WEB_PORT': '8080'
-        }
-        
-        result = self.service.validate_config(config_data)
-        self.assertTrue(result['valid'])
-        self.assertEqual(len(result['errors']), 0)
+    # (name, config_data, expected_valid, expected_errors)
+    VALIDATE_CASES = (
+        ('valid',
+         {'API_BASE_URL': 'http://test:8000', 'CLIP_MODEL_NAME': 'test-model', 'WEB_PORT': '8080'},
+         True, ()),
+        ('missing_required',
+         {'WEB_PORT': '8080'},
+         False, ('API_BASE_URL is required', 'CLIP_MODEL_NAME is required')),
+        ('invalid_port',
+         {'API_BASE_URL': 'http://test:8000', 'CLIP_MODEL_NAME': 'test-model', 'WEB_PORT': '99999'},
+         False, ('WEB_PORT must be between 1024 and 65535',)),
+        ('non_numeric_port',
+         {'API_BASE_URL': 'http://test:8000', 'CLIP_MODEL_NAME': 'test-model', 'WEB_PORT': 'invalid'},
+         False, ('WEB_PORT must be a valid number',)),
+        ('empty_values',
+         {'API_BASE_URL': '', 'CLIP_MODEL_NAME': '', 'WEB_PORT': '8080'},
+         False, ('API_BASE_URL is required', 'CLIP_MODEL_NAME is required')),
+    )
     
-    def test_validate_config_missing_required(self):
-        """Test validating configuration with missing required fields"""
-        config_data = {
-            'WEB_PORT': '8080'
-        }
-        
-        result = self.service.validate_config(config_data)
-        self.assertFalse(result['valid'])
-        self.assertIn('API_BASE_URL is required', result['errors'])
-        self.assertIn('CLIP_MODEL_NAME is required', result['errors'])
-    
-    def test_validate_config_invalid_port(self):
-        """Test validating configuration with invalid port"""
-        config_data = {
-            'API_BASE_URL': 'http://test:8000',
-            'CLIP_MODEL_NAME': 'test-model',
-            'WEB_PORT': '99999'  # Invalid port
-        }
-        
-        result = self.service.validate_config(config_data)
-        self.assertFalse(result['valid'])
-        self.assertIn('WEB_PORT must be between 1024 and 65535', result['errors'])
-    
-    def test_validate_config_non_numeric_port(self):
-        """Test validating configuration with non-numeric port"""
-        config_data = {
-            'API_BASE_URL': 'http://test:8000',
-            'CLIP_MODEL_NAME': 'test-model',
-            'WEB_PORT': 'invalid'
-        }
-        
-        result = self.service.validate_config(config_data)
-        self.assertFalse(result['valid'])
-        self.assertIn('WEB_PORT must be a valid number', result['errors'])
-    
-    def test_validate_config_empty_values(self):
-        """Test validating configuration with empty values"""
-        config_data = {
-            'API_BASE_URL': '',
-            'CLIP_MODEL_NAME': '',
-            'WEB_PORT': '8080'
-        }
-        
-        result = self.service.validate_config(config_data)
-        self.assertFalse(result['valid'])
-        self.assertIn('API_BASE_URL is required', result['errors'])
-        self.assertIn('CLIP_MODEL_NAME is required', result['errors'])
+    def test_validate_config_table(self):
+        """Test validating valid and invalid configurations"""
+        for name, config_data, expected_valid, expected_errors in self.VALIDATE_CASES:
+            with self.subTest(name=name):
+                result = self.service.validate_config(config_data)
+                self.assertEqual(result['valid'], expected_valid)
+                if expected_valid:
+                    self.assertEqual(len(result['errors']), 0)
+                for error in expected_errors:
+                    self.assertIn(error, result['errors'])
 
 
 if __name__ == '__main__':
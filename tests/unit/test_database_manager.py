@@ -11,9 +11,6 @@ from unittest.mock import patch, MagicMock
 import sys
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-
 from src.database.db_manager import DatabaseManager
 
 class TestDatabaseManager(unittest.TestCase):
@@ -10,9 +10,6 @@ import tempfile
 import shutil
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-
 from src.utils.installer import (
     check_python_version,
     install_dependencies,
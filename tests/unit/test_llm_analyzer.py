@@ -11,11 +11,11 @@ import shutil
 from pathlib import Path
 import requests
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-
 from src.analyzers.llm_analyzer import analyze_image_with_llm, LLMAnalyzer, MODELS, PROMPTS
 
+# Minimal valid 1x1 JPEG
+MINIMAL_JPEG = Path(__file__).parent.parent / "fixtures" / "minimal.jpg"
+
 class TestLLMAnalyzer(unittest.TestCase):
     """Test cases for LLM analyzer functionality"""
     
@@ -25,9 +25,8 @@ class TestLLMAnalyzer(unittest.TestCase):
         self.temp_dir = tempfile.mkdtemp()
         self.test_image_path = os.path.join(self.temp_dir, "test_image.jpg")
         
-        # Create a valid JPEG image file
-        with open(self.test_image_path, 'wb') as f:
-            f.write(b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x01\x00H\x00H\x00\x00\xff\xdb\x00C\x00\x08\x06\x06\x07\x06\x05\x08\x07\x07\x07\t\t\x08\n\x0c\x14\r\x0c\x0b\x0b\x0c\x19\x12\x13\x0f\x14\x1d\x1a\x1f\x1e\x1d\x1a\x1c\x1c $.\' ",#\x1c\x1c(7),01444\x1f\'9=82<.342\xff\xc0\x00\x11\x08\x00\x01\x00\x01\x01\x01\x11\x00\x02\x11\x01\x03\x11\x01\xff\xc4\x00\x14\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x08\xff\xc4\x00\x14\x10\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xff\xda\x00\x0c\x03\x01\x00\x02\x11\x03\x11\x00\x3f\x00\xaa\xff\xd9')
+        # Copy in the minimal JPEG fixture
+        shutil.copy(MINIMAL_JPEG, self.test_image_path)
         
         self.prompt_ids = ["P1", "P2"]
         self.model_number = 1
@@ -8,9 +8,6 @@ import sys
 import os
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 from main import show_help, main
 
 class TestMain(unittest.TestCase):
@@ -8,11 +8,11 @@ import sys
 import os
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-
 from src.analyzers.metadata_extractor import extract_metadata, process_image_file
 
+# Minimal valid 1x1 JPEG
+MINIMAL_JPEG = Path(__file__).parent.parent / "fixtures" / "minimal.jpg"
+
 class TestMetadataExtractor(unittest.TestCase):
     """Test cases for metadata extractor functionality"""
     
@@ -25,9 +25,8 @@ class TestMetadataExtractor(unittest.TestCase):
         self.temp_dir = tempfile.mkdtemp()
         self.test_image_path = os.path.join(self.temp_dir, "test_image.jpg")
         
-        # Create a dummy image file
-        with open(self.test_image_path, 'wb') as f:
-            f.write(b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01\x01\x01\x00H\x00H\x00\x00\xff\xdb\x00C\x00\x08\x06\x06\x07\x06\x05\x08\x07\x07\x07\t\t\x08\n\x0c\x14\r\x0c\x0b\x0b\x0c\x19\x12\x13\x0f\x14\x1d\x1a\x1f\x1e\x1d\x1a\x1c\x1c $.\' ",#\x1c\x1c(7),01444\x1f\'9=82<.342\xff\xc0\x00\x11\x08\x00\x01\x00\x01\x01\x01\x11\x00\x02\x11\x01\x03\x11\x01\xff\xc4\x00\x14\x00\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x08\xff\xc4\x00\x14\x10\x01\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\xff\xda\x00\x0c\x03\x01\x00\x02\x11\x03\x11\x00\x3f\x00\xaa\xff\xd9')
+        # Copy in the minimal JPEG fixture
+        shutil.copy(MINIMAL_JPEG, self.test_image_path)
     
     def tearDown(self):
         """Clean up test fixtures"""
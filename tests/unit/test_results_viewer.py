@@ -11,9 +11,6 @@ import tempfile
 import shutil
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-
 from src.viewers.results_viewer import (
     load_analysis_file,
     find_analysis_files,
@@ -9,9 +9,6 @@ import json
 import sys
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src"))
-
 from src.utils.wildcard_generator import WildcardGenerator
 
 class TestWildcardGenerator(unittest.TestCase):